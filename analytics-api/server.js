@@ -371,19 +371,20 @@ app.get('/api/analytics/occupancy', async (req, res) => {
   try {
     const { period = 'week', roomId } = req.query;
     
-    // Obtener todas las salas
-    const roomsResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms`);
-    if (!roomsResponse.success) {
-      return res.status(500).json({ success: false, error: 'Failed to fetch rooms' });
+    // Estadísticas agregadas de todas las salas en una sola llamada a rooms-api
+    const statsParams = new URLSearchParams({ include_schedule_ids: 'true' });
+    if (roomId) statsParams.append('room_id', roomId);
+    if (period !== 'all') {
+      statsParams.append('from', moment().subtract(1, period).format('YYYY-MM-DDTHH:mm:ss'));
     }
     
-    const rooms = roomsResponse.data;
-    let filteredRooms = rooms;
-    
-    if (roomId) {
-      filteredRooms = rooms.filter(room => room.id === parseInt(roomId));
+    const statsResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms/stats?${statsParams.toString()}`);
+    if (!statsResponse.success) {
+      return res.status(500).json({ success: false, error: 'Failed to fetch rooms' });
     }
     
+    const filteredRooms = statsResponse.data;
+    
     // Obtener reservas con límite
     const reservationsResponse = await makeRequest(`${RESERVATIONS_API_URL}/api/reservations?limit=200`);
     if (!reservationsResponse.success) {
@@ -402,61 +403,30 @@ app.get('/api/analytics/occupancy', async (req, res) => {
     }
     
     // Calcular ocupación por sala
-    const occupancyStats = await Promise.all(
-      filteredRooms.map(async (room) => {
-        try {
-          // Obtener asientos de la sala
-          const seatsResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms/${room.id}/seats`);
-          const totalSeats = seatsResponse.success ? seatsResponse.data.length : 0;
-          
-          // Obtener horarios de la sala
-          const schedulesResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules?room_id=${room.id}`);
-          const schedules = schedulesResponse.success ? schedulesResponse.data : [];
-          
-          // Filtrar horarios por período
-          let filteredSchedules = schedules;
-          if (period !== 'all') {
-            const cutoffDate = moment().subtract(1, period).toDate();
-            filteredSchedules = schedules.filter(schedule => 
-              new Date(schedule.show_time) >= cutoffDate
-            );
-          }
-          
-          // Calcular asientos ocupados
-          const roomReservations = reservations.filter(reservation => 
-            filteredSchedules.some(schedule => schedule.id === reservation.scheduleId)
-          );
-          
-          const occupiedSeats = _.sumBy(roomReservations, reservation => 
-            reservation.reservedSeats ? reservation.reservedSeats.length : 0
-          );
-          
-          const totalPossibleSeats = totalSeats * filteredSchedules.length;
-          const occupancyRate = totalPossibleSeats > 0 ? (occupiedSeats / totalPossibleSeats) * 100 : 0;
-          
-          return {
-            roomId: room.id,
-            roomName: room.name,
-            totalSeats,
-            totalSchedules: filteredSchedules.length,
-            occupiedSeats,
-            totalPossibleSeats,
-            occupancyRate: Math.round(occupancyRate * 100) / 100
-          };
-        } catch (error) {
-          console.error(`Error calculating occupancy for room ${room.id}:`, error.message);
-          return {
-            roomId: room.id,
-            roomName: room.name,
-            totalSeats: 0,
-            totalSchedules: 0,
-            occupiedSeats: 0,
-            totalPossibleSeats: 0,
-            occupancyRate: 0
-          };
-        }
-      })
-    );
+    const occupancyStats = filteredRooms.map((room) => {
+      const totalSeats = room.seats.total;
+      const scheduleIds = new Set(room.schedule_ids);
+      
+      // Calcular asientos ocupados
+      const roomReservations = filteredReservations.filter(reservation => scheduleIds.has(reservation.scheduleId));
+      
+      const occupiedSeats = _.sumBy(roomReservations, reservation => 
+        reservation.reservedSeats ? reservation.reservedSeats.length : 0
+      );
+      
+      const totalPossibleSeats = totalSeats * room.active_schedules;
+      const occupancyRate = totalPossibleSeats > 0 ? (occupiedSeats / totalPossibleSeats) * 100 : 0;
+      
+      return {
+        roomId: room.room_id,
+        roomName: room.name,
+        totalSeats,
+        totalSchedules: room.active_schedules,
+        occupiedSeats,
+        totalPossibleSeats,
+        occupancyRate: Math.round(occupancyRate * 100) / 100
+      };
+    });
     
     // Calcular estadísticas generales
     const totalOccupiedSeats = _.sumBy(occupancyStats, 'occupiedSeats');
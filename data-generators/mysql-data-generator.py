@@ -37,7 +37,9 @@ def create_tables_if_not_exist(cursor):
             capacity INT NOT NULL,
             screen_type VARCHAR(50) NOT NULL,
             is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_rooms_updated (updated_at)
         )
     """)
     
@@ -50,8 +52,10 @@ def create_tables_if_not_exist(cursor):
             `seat_number` INT NOT NULL,
             seat_type VARCHAR(50) NOT NULL DEFAULT 'regular',
             is_available BOOLEAN DEFAULT TRUE,
+            position INT NOT NULL,
             FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE CASCADE,
-            UNIQUE KEY unique_seat (room_id, `row_number`, `seat_number`)
+            UNIQUE KEY unique_seat (room_id, `row_number`, `seat_number`),
+            UNIQUE KEY unique_seat_position (room_id, position)
         )
     """)
     
@@ -63,11 +67,17 @@ def create_tables_if_not_exist(cursor):
             movie_id VARCHAR(100) NOT NULL,
             show_time DATETIME NOT NULL,
             price DECIMAL(10,2) NOT NULL,
+            duration_minutes INT NOT NULL DEFAULT 120,
             is_active BOOLEAN DEFAULT TRUE,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE CASCADE
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE CASCADE,
+            INDEX idx_schedules_movie_active_time (movie_id, is_active, show_time),
+            INDEX idx_schedules_updated (updated_at)
         )
     """)
+    # Las tablas de retenciones y mapas de asientos las crea rooms-api (python migrate.py),
+    # que también añade las columnas nuevas a tablas creadas por versiones anteriores
     
     print("✅ Tablas verificadas/creadas correctamente")
 
@@ -95,7 +105,8 @@ def generate_seats(room_id, capacity):
                 'row_number': chr(65 + row),
                 'seat_number': seat_num,
                 'seat_type': seat_type,
-                'is_available': random.choice([True, True, True, False])
+                'is_available': random.choice([True, True, True, False]),
+                'position': seat_count  # bit del asiento en los mapas de rooms-api
             })
             seat_count += 1
             if seat_count >= capacity:
@@ -119,6 +130,7 @@ def generate_schedule():
         'room_id': random.randint(1, 100),
         'show_time': random_date,
         'price': round(random.uniform(5.0, 25.0), 2),
+        'duration_minutes': random.choice([90, 105, 120, 135, 150]),
         'is_active': random.choice([True, True, True, False])
     }
 
@@ -152,8 +164,8 @@ def generate_data():
             all_seats.extend(seats)
             if len(all_seats) >= 1000:
                 insert_seat_query = """
-                INSERT INTO seats (room_id, `row_number`, seat_number, seat_type, is_available)
-                VALUES (%(room_id)s, %(row_number)s, %(seat_number)s, %(seat_type)s, %(is_available)s)
+                INSERT INTO seats (room_id, `row_number`, seat_number, seat_type, is_available, position)
+                VALUES (%(room_id)s, %(row_number)s, %(seat_number)s, %(seat_type)s, %(is_available)s, %(position)s)
                 """
                 cursor.executemany(insert_seat_query, all_seats)
                 connection.commit()
@@ -161,8 +173,8 @@ def generate_data():
                 all_seats = []
         if all_seats:
             insert_seat_query = """
-            INSERT INTO seats (room_id, `row_number`, seat_number, seat_type, is_available)
-            VALUES (%(room_id)s, %(row_number)s, %(seat_number)s, %(seat_type)s, %(is_available)s)
+            INSERT INTO seats (room_id, `row_number`, seat_number, seat_type, is_available, position)
+            VALUES (%(room_id)s, %(row_number)s, %(seat_number)s, %(seat_type)s, %(is_available)s, %(position)s)
             """
             cursor.executemany(insert_seat_query, all_seats)
             connection.commit()
@@ -175,8 +187,8 @@ def generate_data():
             schedules.append(generate_schedule())
             if len(schedules) >= 1000:
                 insert_schedule_query = """
-                INSERT INTO schedules (movie_id, room_id, show_time, price, is_active)
-                VALUES (%(movie_id)s, %(room_id)s, %(show_time)s, %(price)s, %(is_active)s)
+                INSERT INTO schedules (movie_id, room_id, show_time, price, duration_minutes, is_active)
+                VALUES (%(movie_id)s, %(room_id)s, %(show_time)s, %(price)s, %(duration_minutes)s, %(is_active)s)
                 """
                 cursor.executemany(insert_schedule_query, schedules)
                 connection.commit()
@@ -184,8 +196,8 @@ def generate_data():
                 schedules = []
         if schedules:
             insert_schedule_query = """
-            INSERT INTO schedules (movie_id, room_id, show_time, price, is_active)
-            VALUES (%(movie_id)s, %(room_id)s, %(show_time)s, %(price)s, %(is_active)s)
+            INSERT INTO schedules (movie_id, room_id, show_time, price, duration_minutes, is_active)
+            VALUES (%(movie_id)s, %(room_id)s, %(show_time)s, %(price)s, %(duration_minutes)s, %(is_active)s)
             """
             cursor.executemany(insert_schedule_query, schedules)
             connection.commit()
@@ -23,9 +23,11 @@ CREATE TABLE seats (
     `seat_number` INT NOT NULL,
     seat_type ENUM('regular', 'premium', 'vip') DEFAULT 'regular',
     is_available BOOLEAN DEFAULT TRUE,
+    position INT NOT NULL, -- Bit del asiento en schedule_seatmaps; fijo desde que se crea el asiento
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (room_id) REFERENCES rooms(id) ON DELETE CASCADE,
-    UNIQUE KEY unique_seat (room_id, `row_number`, `seat_number`)
+    UNIQUE KEY unique_seat (room_id, `row_number`, `seat_number`),
+    UNIQUE KEY unique_seat_position (room_id, position)
 );
 
 -- Tabla de Horarios
@@ -35,6 +37,7 @@ CREATE TABLE schedules (
     room_id INT NOT NULL,
     show_time DATETIME NOT NULL,
     price DECIMAL(10,2) NOT NULL CHECK (price > 0),
+    duration_minutes INT NOT NULL DEFAULT 120 CHECK (duration_minutes > 0), -- Duración, para detectar solapes en la sala
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -42,14 +45,43 @@ CREATE TABLE schedules (
     UNIQUE KEY unique_schedule (room_id, show_time) -- Evitar dobles horarios en la misma sala
 );
 
+-- Mapa de ocupación por horario: bitset empaquetado, bit i = asiento con seats.position = i retenido.
+-- version permite actualizaciones optimistas.
+CREATE TABLE schedule_seatmaps (
+    schedule_id INT PRIMARY KEY,
+    bitmap VARBINARY(1024) NOT NULL,
+    version INT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (schedule_id) REFERENCES schedules(id) ON DELETE CASCADE
+);
+
+-- Retenciones temporales de asientos (ver POST /api/schedules/:id/holds en rooms-api).
+-- El cambio de status condicionado a 'held' decide quién libera los bits del mapa.
+CREATE TABLE seat_holds (
+    id CHAR(32) PRIMARY KEY, -- uuid4 hex, token para confirmar/liberar
+    schedule_id INT NOT NULL,
+    positions TEXT NOT NULL, -- JSON con las posiciones del layout retenidas
+    status ENUM('held', 'confirmed', 'released', 'expired') NOT NULL DEFAULT 'held',
+    expires_at DATETIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (schedule_id) REFERENCES schedules(id) ON DELETE CASCADE,
+    INDEX idx_seat_holds_expiry (schedule_id, status, expires_at)
+);
+
 -- Índices para mejorar performance
 CREATE INDEX idx_rooms_active ON rooms(is_active);
 CREATE INDEX idx_seats_room ON seats(room_id);
 CREATE INDEX idx_seats_available ON seats(is_available);
-CREATE INDEX idx_schedules_movie ON schedules(movie_id);
+-- Compuesto (movie_id, is_active, show_time): cubre los listados por película con ventana de fechas
+-- y hace redundante un índice solo sobre movie_id (es su prefijo)
+CREATE INDEX idx_schedules_movie_active_time ON schedules(movie_id, is_active, show_time);
 CREATE INDEX idx_schedules_room ON schedules(room_id);
 CREATE INDEX idx_schedules_time ON schedules(show_time);
 CREATE INDEX idx_schedules_active ON schedules(is_active);
+-- Marcadores de versión para ETag (MAX(updated_at) resuelto desde el índice)
+CREATE INDEX idx_rooms_updated ON rooms(updated_at);
+CREATE INDEX idx_schedules_updated ON schedules(updated_at);
 
 -- Datos de ejemplo
 INSERT INTO rooms (name, capacity, screen_type) VALUES
@@ -59,7 +91,7 @@ INSERT INTO rooms (name, capacity, screen_type) VALUES
 ('Sala 4', 60, '2D');
 
 -- Generar asientos para las salas (mejorado)
-INSERT INTO seats (room_id, `row_number`, `seat_number`, seat_type)
+INSERT INTO seats (room_id, `row_number`, `seat_number`, seat_type, position)
 SELECT 
     r.id,
     CHAR(65 + FLOOR((s.seat_num - 1) / 10)) as `row_number`,
@@ -68,7 +100,8 @@ SELECT
         WHEN CHAR(65 + FLOOR((s.seat_num - 1) / 10)) IN ('A', 'B') THEN 'vip'        -- Primeras 2 filas VIP
         WHEN CHAR(65 + FLOOR((s.seat_num - 1) / 10)) IN ('C', 'D', 'E') THEN 'premium' -- Siguientes 3 filas Premium  
         ELSE 'regular'
-    END as seat_type
+    END as seat_type,
+    s.seat_num - 1 as position
 FROM rooms r
 CROSS JOIN (
     SELECT 1 as seat_num UNION SELECT 2 UNION SELECT 3 UNION SELECT 4 UNION SELECT 5 UNION
@@ -28,14 +28,15 @@ const MOVIES_API_URL = process.env.MOVIES_API_URL || 'http://localhost:3001';
 const ROOMS_API_URL = process.env.ROOMS_API_URL || 'http://localhost:3002';
 const RESERVATIONS_API_URL = process.env.RESERVATIONS_API_URL || 'http://localhost:3003';
 
-// Función helper para hacer requests a otros servicios
-const makeRequest = async (url, method = 'GET', data = null) => {
+// Función helper para hacer requests a otros servicios (devuelve la respuesta completa de axios)
+const sendRequest = async (url, method = 'GET', data = null, headers = {}) => {
   try {
     const config = {
       method,
       url,
       headers: {
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        ...headers
       }
     };
     
@@ -43,14 +44,71 @@ const makeRequest = async (url, method = 'GET', data = null) => {
       config.data = data;
     }
     
-    const response = await axios(config);
-    return response.data;
+    return await axios(config);
   } catch (error) {
     console.error(`Error calling ${url}:`, error.message);
     throw new Error(`Service unavailable: ${error.message}`);
   }
 };
 
+const makeRequest = async (url, method = 'GET', data = null, headers = {}) => {
+  const response = await sendRequest(url, method, data, headers);
+  return response.data;
+};
+
+// Marca de escritura reciente de rooms-api: con réplica de lectura, el cliente que acaba de
+// escribir lee del primario mientras la reenvíe (cabecera X-Last-Write o cookie rooms_last_write)
+const ROOMS_WRITE_HEADER = 'X-Last-Write';
+const ROOMS_WRITE_COOKIE = 'rooms_last_write';
+
+const roomsWriteHeaders = (req) => {
+  const headers = {};
+  const lastWrite = req.get(ROOMS_WRITE_HEADER);
+  if (lastWrite) {
+    headers[ROOMS_WRITE_HEADER] = lastWrite;
+  }
+  const cookie = (req.get('Cookie') || '')
+    .split(';')
+    .map((part) => part.trim())
+    .find((part) => part.startsWith(`${ROOMS_WRITE_COOKIE}=`));
+  if (cookie) {
+    headers.Cookie = cookie;
+  }
+  return headers;
+};
+
+// Devuelve al cliente la marca que rooms-api pone en cada escritura
+const forwardRoomsWrite = (response, res) => {
+  const lastWrite = response.headers[ROOMS_WRITE_HEADER.toLowerCase()];
+  if (lastWrite) {
+    res.set(ROOMS_WRITE_HEADER, lastWrite);
+  }
+  (response.headers['set-cookie'] || [])
+    .filter((cookie) => cookie.startsWith(`${ROOMS_WRITE_COOKIE}=`))
+    .forEach((cookie) => res.append('Set-Cookie', cookie));
+};
+
+// Obtener varias salas en una sola llamada a rooms-api (indexadas por id)
+const ROOMS_BATCH_SIZE = 500;
+const fetchRoomsById = async (roomIds, headers = {}) => {
+  const uniqueIds = [...new Set(roomIds.filter((id) => id !== undefined && id !== null))];
+  const rooms = {};
+
+  for (let i = 0; i < uniqueIds.length; i += ROOMS_BATCH_SIZE) {
+    const chunk = uniqueIds.slice(i, i + ROOMS_BATCH_SIZE);
+    try {
+      const response = await makeRequest(`${ROOMS_API_URL}/api/rooms/batch?ids=${chunk.join(',')}`, 'GET', null, headers);
+      if (response.success) {
+        Object.assign(rooms, response.data);
+      }
+    } catch (error) {
+      console.error('Error fetching rooms batch:', error.message);
+    }
+  }
+
+  return rooms;
+};
+
 /**
  * @swagger
  * /health:
@@ -140,12 +198,15 @@ app.get('/api/showtimes', async (req, res) => {
       schedulesUrl += `?${scheduleParams.toString()}`;
     }
     
-    const schedules = await makeRequest(schedulesUrl);
+    const schedules = await makeRequest(schedulesUrl, 'GET', null, roomsWriteHeaders(req));
     
     if (!schedules.success) {
       return res.status(500).json({ success: false, error: 'Failed to fetch schedules' });
     }
     
+    // Obtener todas las salas de la página en una sola llamada
+    const roomsById = await fetchRoomsById(schedules.data.map((schedule) => schedule.room_id), roomsWriteHeaders(req));
+    
     // Enriquecer con información de películas y salas
     const enrichedSchedules = await Promise.all(
       schedules.data.map(async (schedule) => {
@@ -154,9 +215,7 @@ app.get('/api/showtimes', async (req, res) => {
           const movieResponse = await makeRequest(`${MOVIES_API_URL}/api/movies/${schedule.movie_id}`);
           const movie = movieResponse.success ? movieResponse.data : null;
           
-          // Obtener información de la sala
-          const roomResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms/${schedule.room_id}`);
-          const room = roomResponse.success ? roomResponse.data : null;
+          const room = roomsById[schedule.room_id] || null;
           
           return {
             ...schedule,
@@ -242,13 +301,13 @@ app.post('/api/book-ticket', async (req, res) => {
     const { userId, scheduleId, movieId, seatIds, totalAmount } = req.body;
     
     // Validar que el horario existe
-    const scheduleResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules/${scheduleId}`);
+    const scheduleResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules/${scheduleId}`, 'GET', null, roomsWriteHeaders(req));
     if (!scheduleResponse.success) {
       return res.status(400).json({ success: false, error: 'Schedule not found' });
     }
     
     // Validar que los asientos están disponibles
-    const seatsResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms/${scheduleResponse.data.room_id}/seats`);
+    const seatsResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms/${scheduleResponse.data.room_id}/seats`, 'GET', null, roomsWriteHeaders(req));
     if (!seatsResponse.success) {
       return res.status(400).json({ success: false, error: 'Failed to fetch seats' });
     }
@@ -316,7 +375,7 @@ app.get('/api/user-dashboard/:userId', async (req, res) => {
           const movie = movieResponse.success ? movieResponse.data : null;
           
           // Obtener información del horario y sala
-          const scheduleResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules/${reservation.scheduleId}`);
+          const scheduleResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules/${reservation.scheduleId}`, 'GET', null, roomsWriteHeaders(req));
           const schedule = scheduleResponse.success ? scheduleResponse.data : null;
           
           return {
@@ -355,26 +414,15 @@ app.get('/api/movie-details/:movieId', async (req, res) => {
     }
     
     // Obtener horarios de la película
-    const schedulesResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules/movie/${movieId}`);
+    const schedulesResponse = await makeRequest(`${ROOMS_API_URL}/api/schedules/movie/${movieId}`, 'GET', null, roomsWriteHeaders(req));
     const schedules = schedulesResponse.success ? schedulesResponse.data : [];
     
-    // Enriquecer horarios con información de salas
-    const enrichedSchedules = await Promise.all(
-      schedules.map(async (schedule) => {
-        try {
-          const roomResponse = await makeRequest(`${ROOMS_API_URL}/api/rooms/${schedule.room_id}`);
-          const room = roomResponse.success ? roomResponse.data : null;
-          
-          return {
-            ...schedule,
-            room
-          };
-        } catch (error) {
-          console.error(`Error enriching schedule ${schedule.id}:`, error.message);
-          return schedule;
-        }
-      })
-    );
+    // Enriquecer horarios con información de salas (una sola llamada en lote)
+    const roomsById = await fetchRoomsById(schedules.map((schedule) => schedule.room_id), roomsWriteHeaders(req));
+    const enrichedSchedules = schedules.map((schedule) => ({
+      ...schedule,
+      room: roomsById[schedule.room_id] || null
+    }));
     
     res.json({
       success: true,
@@ -430,8 +478,9 @@ app.use('/api/movies', async (req, res) => {
 app.use('/api/rooms', async (req, res) => {
   try {
     const url = `${ROOMS_API_URL}/api/rooms${req.url}`;
-    const response = await makeRequest(url, req.method, req.body);
-    res.json(response);
+    const response = await sendRequest(url, req.method, req.body, roomsWriteHeaders(req));
+    forwardRoomsWrite(response, res);
+    res.json(response.data);
   } catch (error) {
     res.status(500).json({ success: false, error: error.message });
   }
@@ -0,0 +1,173 @@
+"""Control de admisión: limita las peticiones que usan la base de datos a la vez en cada worker.
+
+Una petición pide plaza la primera vez que va a consultar la base de datos (desde
+``RoutingSession.get_bind``), no al entrar: ``/health``, ``/metrics``, los aciertos de la caché
+del catálogo y las peticiones agrupadas por ``coalesce`` no consultan nada y nunca esperan.
+Si no hay plaza, espera en una cola acotada; las rutas marcadas con ``@low_priority``
+(listados caros sin límite) solo ocupan ``ADMISSION_LOW_PRIORITY_SLOTS`` plazas, ceden el
+turno a cualquier petición normal que espere y, con la cola llena, una petición normal
+ocupa el sitio de una de ellas. Con la cola llena, o tras esperar ``ADMISSION_QUEUE_TIMEOUT``
+segundos, la petición se descarta con 503 y ``Retry-After``.
+
+Por defecto los límites salen del pool de conexiones del worker (ver ``default_limits``), así
+que crecen o menguan con el reparto de ``pool.py``. Las esperas ocupan un hilo: con workers
+gthread, ``GUNICORN_THREADS`` debe superar ``ADMISSION_MAX_CONCURRENT + ADMISSION_MAX_QUEUE``
+para que siempre queden hilos libres; gunicorn.conf.py lo calcula así si no se fija.
+"""
+from threading import Condition
+import os
+import time
+
+from flask import current_app, g, has_request_context, jsonify, request
+from werkzeug.exceptions import ServiceUnavailable
+
+from pool import engine_options_from_env
+
+
+def default_limits():
+    """``(max_concurrent, max_queue)`` por defecto según el pool de este worker.
+
+    Una plaza por conexión del pool menos la que queda para el refresco de disponibilidad:
+    admitir más solo movería la espera al pool. Con un solo proceso (10 + 20) son 29 plazas y
+    14 en cola; con los 17 workers de una máquina de 8 CPU (5 + 0), 4 y 2.
+    """
+    options = engine_options_from_env()
+    max_concurrent = max(options['pool_size'] + options['max_overflow'] - 1, 1)
+    return max_concurrent, max(max_concurrent // 2, 2)
+
+
+DEFAULT_MAX_CONCURRENT, DEFAULT_MAX_QUEUE = default_limits()
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', DEFAULT_MAX_CONCURRENT))
+MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+LOW_PRIORITY_SLOTS = int(os.getenv('ADMISSION_LOW_PRIORITY_SLOTS', 2))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 2))
+RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER', 1))
+
+HIGH = 'high'
+LOW = 'low'
+
+
+class Overloaded(ServiceUnavailable):
+    description = 'Service overloaded, retry later'
+
+
+def low_priority(view):
+    """Marca una vista como cara: se limita su concurrencia y es la primera en descartarse."""
+    view.admission_priority = LOW
+    return view
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent=MAX_CONCURRENT, max_queue=MAX_QUEUE, low_slots=LOW_PRIORITY_SLOTS,
+                 timeout=QUEUE_TIMEOUT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.low_slots = low_slots
+        self.timeout = timeout
+        self.active = {HIGH: 0, LOW: 0}
+        self.waiting = {HIGH: 0, LOW: 0}
+        self.admitted = {HIGH: 0, LOW: 0}
+        self.shed = {}  # (prioridad, motivo) -> peticiones descartadas
+        self._displaced = 0  # esperas de baja prioridad que deben dejar la cola a una normal
+        self._condition = Condition()
+
+    def _has_slot(self, priority):
+        if self.active[HIGH] + self.active[LOW] >= self.max_concurrent:
+            return False
+        if priority == LOW:
+            return self.active[LOW] < self.low_slots and self.waiting[HIGH] == 0
+        return True
+
+    def _shed(self, priority, reason):
+        key = (priority, reason)
+        self.shed[key] = self.shed.get(key, 0) + 1
+        return False
+
+    def acquire(self, priority):
+        """True si la petición puede continuar; False si se descarta."""
+        with self._condition:
+            if not self._has_slot(priority):
+                if self.waiting[HIGH] + self.waiting[LOW] - self._displaced >= self.max_queue:
+                    if priority == LOW or self.waiting[LOW] <= self._displaced:
+                        return self._shed(priority, 'queue_full')
+                    # Cola llena: una petición normal saca de la cola a una de baja prioridad
+                    self._displaced += 1
+                    self._condition.notify_all()
+                deadline = time.monotonic() + self.timeout
+                self.waiting[priority] += 1
+                try:
+                    while not self._has_slot(priority):
+                        if priority == LOW and self._displaced:
+                            self._displaced -= 1
+                            return self._shed(priority, 'displaced')
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return self._shed(priority, 'timeout')
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting[priority] -= 1
+                    self._displaced = min(self._displaced, self.waiting[LOW])
+                    # Una petición de baja prioridad puede estar esperando a que esta deje la cola
+                    self._condition.notify_all()
+            self.active[priority] += 1
+            self.admitted[priority] += 1
+            return True
+
+    def release(self, priority):
+        with self._condition:
+            self.active[priority] -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': dict(self.active),
+                'waiting': dict(self.waiting),
+                'admitted': dict(self.admitted),
+                'shed': {f'{priority}:{reason}': count for (priority, reason), count in sorted(self.shed.items())}
+            }
+
+
+controller = AdmissionController()
+
+
+def admit():
+    """Reserva plaza para la petición en curso (una vez por petición) o lanza ``Overloaded``."""
+    if not ADMISSION_ENABLED or not has_request_context() or 'admission_priority' in g:
+        return
+    if was_shed():
+        raise Overloaded(retry_after=RETRY_AFTER_SECONDS)
+    view = current_app.view_functions.get(request.endpoint)
+    priority = getattr(view, 'admission_priority', HIGH)
+    if not controller.acquire(priority):
+        g.admission_shed = True
+        raise Overloaded(retry_after=RETRY_AFTER_SECONDS)
+    g.admission_priority = priority
+
+
+def was_shed():
+    return g.get('admission_shed', False)
+
+
+def _shed_response(response):
+    # Las vistas capturan Exception y devolverían 500: la respuesta se sustituye por el 503
+    if was_shed():
+        response = jsonify({'success': False, 'error': Overloaded.description})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
+def _release(exc=None):
+    priority = g.pop('admission_priority', None)
+    if priority is not None:
+        controller.release(priority)
+
+
+def init_app(app):
+    """Registra los hooks; debe ir después de ``compression.init_app`` para que el 503 se mida y no se comprima."""
+    app.after_request(_shed_response)
+    app.teardown_request(_release)
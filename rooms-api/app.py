@@ -1,17 +1,43 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from marshmallow import Schema, fields, ValidationError
-from datetime import datetime
+from datetime import datetime, timedelta
+from threading import Lock
+from types import SimpleNamespace
+import base64
+import binascii
+import hashlib
+import json
 import os
+import time
+import uuid
 from dotenv import load_dotenv
-from flasgger import Swagger, swag_from
+from openapi import swag_from
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import NotFound
+from cache import MISSING, TTLCache
+import seatmap
+from layouts import SEAT_LAYOUT_TEMPLATES, build_layout, rows_for_capacity
+from pool import engine_options_from_env, pool_status
+from availability import AvailabilityIndex, RoomIntervals
+import admission
+from admission import low_priority
+import compression
+from coalesce import coalesced
+import coalesce
+import metrics
+import sqltrace
+import openapi
+import replica
+from replica import read_from_replica
+from serializers import (
+    FastJSONProvider, dumps, serialize_room, serialize_seat, serialize_schedule,
+    SCHEDULE_LIST_FIELDS, MOVIE_SCHEDULE_FIELDS, ROOM_FIELDS, SEAT_FIELDS
+)
 
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
-
 # Configuración de Swagger
 swagger_config = {
     "headers": [],
@@ -94,6 +120,7 @@ swagger_template = {
                 "movie_id": {"type": "string", "example": "507f1f77bcf86cd799439011"},
                 "show_time": {"type": "string", "format": "date-time"},
                 "price": {"type": "number", "example": 12.50},
+                "duration_minutes": {"type": "integer", "example": 120, "description": "Running time, used for overlap checks"},
                 "is_active": {"type": "boolean", "example": True}
             }
         },
@@ -109,13 +136,45 @@ swagger_template = {
     }
 }
 
-swagger = Swagger(app, config=swagger_config, template=swagger_template)
+# Máximo de ids aceptados por /api/rooms/batch
+MAX_BATCH_IDS = int(os.getenv('MAX_BATCH_IDS', 500))
+
+# Caché del catálogo (salas y asientos cambian muy poco)
+ROOM_CACHE_TTL = int(os.getenv('ROOM_CACHE_TTL', 300))
+SEAT_CACHE_TTL = int(os.getenv('SEAT_CACHE_TTL', 600))
+catalog_cache = TTLCache(maxsize=int(os.getenv('CATALOG_CACHE_SIZE', 2048)), default_ttl=ROOM_CACHE_TTL)
+
+# Reintentos de la actualización optimista (por versión) del mapa de asientos
+SEATMAP_MAX_RETRIES = int(os.getenv('SEATMAP_MAX_RETRIES', 5))
+
+# Retenciones de asientos: duración por defecto y máxima (segundos)
+HOLD_TTL_SECONDS = int(os.getenv('HOLD_TTL_SECONDS', 300))
+HOLD_MAX_TTL_SECONDS = int(os.getenv('HOLD_MAX_TTL_SECONDS', 900))
+
+# Filas leídas por lote del cursor del servidor en las respuestas NDJSON
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 1000))
+
+# Duración de las funciones (minutos) y margen de limpieza entre funciones de la misma sala
+DEFAULT_SCHEDULE_DURATION = int(os.getenv('DEFAULT_SCHEDULE_DURATION', 120))
+MAX_SCHEDULE_DURATION = int(os.getenv('MAX_SCHEDULE_DURATION', 600))
+SCHEDULE_CLEANUP_MINUTES = int(os.getenv('SCHEDULE_CLEANUP_MINUTES', 15))
+MAX_SCHEDULE_SPAN = timedelta(minutes=MAX_SCHEDULE_DURATION + SCHEDULE_CLEANUP_MINUTES)
+
+# Máximo de horarios por petición a /api/schedules/bulk
+MAX_BULK_SCHEDULES = int(os.getenv('MAX_BULK_SCHEDULES', 2000))
 
-# Configuración de la base de datos
-app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}@{os.getenv('MYSQL_HOST')}:{os.getenv('MYSQL_PORT')}/{os.getenv('MYSQL_DATABASE')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Índice de disponibilidad: cada cuánto se traen los cambios hechos por otros procesos y
+# desde cuántos días atrás se cargan los horarios
+AVAILABILITY_REFRESH_SECONDS = float(os.getenv('AVAILABILITY_REFRESH_SECONDS', 5))
+AVAILABILITY_HORIZON_DAYS = int(os.getenv('AVAILABILITY_HORIZON_DAYS', 1))
+# Cada refresco vuelve a leer las filas cambiadas en estos últimos segundos antes de la marca:
+# cubre transacciones que confirman después de que la marca haya pasado su updated_at
+AVAILABILITY_SYNC_OVERLAP_SECONDS = float(os.getenv('AVAILABILITY_SYNC_OVERLAP_SECONDS', 60))
+availability_index = AvailabilityIndex()
 
-db = SQLAlchemy(app)
+# Las lecturas de las vistas con @read_from_replica pueden ir a la réplica (ver replica.py)
+db = SQLAlchemy(session_options={'class_': replica.RoutingSession})
+bp = Blueprint('rooms', __name__)
 
 # Modelos
 class Room(db.Model):
@@ -132,6 +191,9 @@ class Room(db.Model):
     # Relaciones
     seats = db.relationship('Seat', backref='room', lazy=True, cascade='all, delete-orphan')
     schedules = db.relationship('Schedule', backref='room', lazy=True, cascade='all, delete-orphan')
+    
+    # MAX(updated_at) del ETag de salas resuelto desde el índice
+    __table_args__ = (db.Index('idx_rooms_updated', 'updated_at'),)
 
 class Seat(db.Model):
     __tablename__ = 'seats'
@@ -142,9 +204,14 @@ class Seat(db.Model):
     seat_number = db.Column(db.Integer, nullable=False)
     seat_type = db.Column(db.Enum('regular', 'premium', 'vip'), default='regular')
     is_available = db.Column(db.Boolean, default=True)
+    # Bit del asiento en los mapas por horario: se asigna al crearlo y no cambia (ver insert_seats)
+    position = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('room_id', 'row_number', 'seat_number', name='unique_seat'),)
+    __table_args__ = (
+        db.UniqueConstraint('room_id', 'row_number', 'seat_number', name='unique_seat'),
+        db.UniqueConstraint('room_id', 'position', name='unique_seat_position'),
+    )
 
 class Schedule(db.Model):
     __tablename__ = 'schedules'
@@ -154,8 +221,39 @@ class Schedule(db.Model):
     room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), nullable=False)
     show_time = db.Column(db.DateTime, nullable=False)
     price = db.Column(db.Numeric(10, 2), nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False, default=DEFAULT_SCHEDULE_DURATION)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Cubre los listados por película: igualdad en movie_id/is_active y rango/orden por show_time;
+    # updated_at sirve el ETag de horarios y el refresco incremental del índice de disponibilidad
+    __table_args__ = (
+        db.Index('idx_schedules_movie_active_time', 'movie_id', 'is_active', 'show_time'),
+        db.Index('idx_schedules_updated', 'updated_at'),
+    )
+
+class ScheduleSeatMap(db.Model):
+    __tablename__ = 'schedule_seatmaps'
+    
+    schedule_id = db.Column(db.Integer, db.ForeignKey('schedules.id', ondelete='CASCADE'), primary_key=True)
+    bitmap = db.Column(db.LargeBinary, nullable=False)  # Ver seatmap.py
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SeatHold(db.Model):
+    __tablename__ = 'seat_holds'
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, sirve de token para confirmar/liberar
+    schedule_id = db.Column(db.Integer, db.ForeignKey('schedules.id', ondelete='CASCADE'), nullable=False)
+    positions = db.Column(db.Text, nullable=False)  # JSON con las posiciones del layout retenidas
+    status = db.Column(db.Enum('held', 'confirmed', 'released', 'expired'), nullable=False, default='held')
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Barrido de retenciones vencidas por horario
+    __table_args__ = (db.Index('idx_seat_holds_expiry', 'schedule_id', 'status', 'expires_at'),)
 
 # Esquemas de validación
 class RoomSchema(Schema):
@@ -173,6 +271,7 @@ class ScheduleSchema(Schema):
     room_id = fields.Int(required=True)
     show_time = fields.DateTime(required=True)
     price = fields.Decimal(required=True)
+    duration_minutes = fields.Int(validate=lambda x: 0 < x <= MAX_SCHEDULE_DURATION)
 
 # Schemas para serialización
 room_schema = RoomSchema()
@@ -182,8 +281,136 @@ seats_schema = SeatSchema(many=True)
 schedule_schema = ScheduleSchema()
 schedules_schema = ScheduleSchema(many=True)
 
+# Paginación por cursor (keyset)
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(kind, *values):
+    """Genera un cursor opaco con la clave de ordenación de la última fila devuelta."""
+    payload = json.dumps({'k': kind, 'v': [v.isoformat() if isinstance(v, datetime) else v for v in values]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(kind, cursor, *converters):
+    """Devuelve los valores del cursor convertidos con ``converters``, validando que pertenezca al mismo listado."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload['k'] != kind:
+            raise InvalidCursor('Cursor does not belong to this listing')
+        return [convert(value) for convert, value in zip(converters, payload['v'], strict=True)]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+
+def paginate_by_id(query, column, kind, limit, offset):
+    """Aplica paginación keyset sobre la clave primaria si hay ``cursor``; si no, limit/offset."""
+    cursor = request.args.get('cursor')
+    query = query.order_by(column)
+    if cursor:
+        last_id, = decode_cursor(kind, cursor, int)
+        rows = query.filter(column > last_id).limit(limit).all()
+    else:
+        rows = query.limit(limit).offset(offset).all()
+    next_cursor = encode_cursor(kind, rows[-1].id) if rows and len(rows) == limit else None
+    return rows, next_cursor
+
+# GET condicionales (ETag / If-None-Match)
+def make_etag(version):
+    """ETag fuerte: hash de la ruta, los parámetros normalizados y el marcador de versión."""
+    args = sorted(request.args.items(multi=True))
+    return hashlib.sha1(repr((request.path, args, version)).encode()).hexdigest()
+
+def etag_response(payload, etag):
+    # Comparación débil: las respuestas comprimidas llevan el mismo ETag marcado como W/
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        # Si los bytes comprimidos de esta versión ya están en caché no se vuelve a serializar
+        response = compression.cached_response(etag)
+        if response is not None:
+            return response
+        response = jsonify(payload)
+    response.set_etag(etag)
+    return response
+
+def conditional_get(version_loader, payload_loader, cache_key=None, ttl=None):
+    """Responde 304 si el cliente ya tiene la versión actual, sin construir el cuerpo JSON.
+
+    ``version_loader`` ejecuta una consulta agregada barata (MAX(updated_at), COUNT(*)...).
+    Si se indica ``cache_key`` el payload se guarda en la caché del catálogo junto a su ETag,
+    de modo que los aciertos de caché no consultan la base de datos.
+    """
+    if cache_key is not None:
+        cached = catalog_cache.get(cache_key)
+        if cached is not MISSING:
+            payload, etag = cached
+            return etag_response(payload, etag)
+
+    etag = make_etag(version_loader())
+    if request.if_none_match.contains_weak(etag):
+        return etag_response(None, etag)
+
+    payload = payload_loader()
+    if cache_key is not None:
+        catalog_cache.set(cache_key, (payload, etag), ttl)
+    return etag_response(payload, etag)
+
+def rooms_version():
+    return tuple(db.session.query(db.func.max(Room.updated_at), db.func.count(Room.id)).one())
+
+def seats_version(room_id):
+    # seats no tiene updated_at: la suma de ids disponibles cambia cuando se ocupa o libera un asiento
+    return tuple(db.session.query(
+        db.func.count(Seat.id),
+        db.func.max(Seat.id),
+        db.func.sum(db.case((Seat.is_available.is_(True), Seat.id), else_=0))
+    ).filter(Seat.room_id == room_id).one())
+
+def wants_ndjson():
+    """True si el cliente pide streaming con ``?stream=1`` o ``Accept: application/x-ndjson``."""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+def ndjson_response(query, serialize):
+    """Escribe cada fila como una línea JSON a medida que llega de un cursor del servidor.
+
+    ``yield_per`` activa ``stream_results``, así que ni el driver ni Python acumulan el
+    resultado completo y la memoria no depende del tamaño del listado.
+    """
+    # La plaza se pide antes de empezar a enviar: descartar a mitad del stream ya no puede dar un 503
+    admission.admit()
+    
+    def generate():
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            yield dumps(serialize(row)) + b'\n'
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def schedules_version():
+    return tuple(db.session.query(db.func.max(Schedule.updated_at), db.func.count(Schedule.id)).one())
+
+# Selección de campos (?fields=id,show_time,price)
+def requested_fields(allowed):
+    """Campos pedidos en ``fields``, en el orden de ``allowed``; todos si no se indica."""
+    raw = request.args.get('fields')
+    if not raw:
+        return allowed
+    fields = {value.strip() for value in raw.split(',') if value.strip()}
+    unknown = fields.difference(allowed)
+    if unknown:
+        raise InvalidFilter(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    return tuple(field for field in allowed if field in fields)
+
+def model_columns(model, fields, always=('id',)):
+    """Columnas a seleccionar para serializar ``fields``; ``always`` son las que necesita la paginación."""
+    return [getattr(model, field) for field in dict.fromkeys((*always, *fields))]
+
+def project(data, fields):
+    return data if len(fields) == len(data) else {field: data[field] for field in fields}
+
 # Rutas para Salas
-@app.route('/api/rooms', methods=['GET'])
+@bp.route('/api/rooms', methods=['GET'])
 @swag_from({
     'tags': ['Rooms'],
     'summary': 'Get all active rooms',
@@ -202,6 +429,18 @@ schedules_schema = ScheduleSchema(many=True)
             'type': 'integer',
             'default': 0,
             'description': 'Number of rooms to skip'
+        },
+        {
+            'name': 'cursor',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Opaque cursor returned as next_cursor by the previous page (takes precedence over offset)'
+        },
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Comma separated subset of room fields to return (only those columns are selected)'
         }
     ],
     'responses': {
@@ -214,7 +453,8 @@ schedules_schema = ScheduleSchema(many=True)
                     'data': {
                         'type': 'array',
                         'items': {'$ref': '#/definitions/Room'}
-                    }
+                    },
+                    'next_cursor': {'type': 'string', 'description': 'Cursor for the next page, null on the last page'}
                 }
             }
         },
@@ -224,48 +464,237 @@ schedules_schema = ScheduleSchema(many=True)
         }
     }
 })
+@coalesced
+@read_from_replica
 def get_rooms():
     try:
         # Get pagination parameters
         limit = request.args.get('limit', default=1000, type=int)
         offset = request.args.get('offset', default=0, type=int)
         
-        # Query with pagination
-        rooms = Room.query.filter_by(is_active=True).limit(limit).offset(offset).all()
+        cursor = request.args.get('cursor')
+        fields = requested_fields(ROOM_FIELDS)
+        
+        def load():
+            # Query with pagination, seleccionando solo las columnas pedidas
+            query = db.session.query(*model_columns(Room, fields)).filter_by(is_active=True)
+            rooms, next_cursor = paginate_by_id(query, Room.id, 'rooms', limit, offset)
+            return {
+                'success': True,
+                'data': [serialize_room(room, fields) for room in rooms],
+                'next_cursor': next_cursor
+            }
         
+        return conditional_get(rooms_version, load, ('rooms', limit, offset, cursor, fields), ROOM_CACHE_TTL)
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': f'Invalid cursor: {e}'}), 400
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/rooms/batch', methods=['GET'])
+@swag_from({
+    'tags': ['Rooms'],
+    'summary': 'Get several rooms by id',
+    'description': 'Resolve a comma separated list of room ids with a single query. Unknown ids are reported in "missing" instead of failing the request',
+    'parameters': [
+        {
+            'name': 'ids',
+            'in': 'query',
+            'type': 'string',
+            'required': True,
+            'description': f'Comma separated room ids (max {MAX_BATCH_IDS})',
+            'example': '1,2,3'
+        },
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Comma separated subset of room fields to return (only those columns are selected)'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Rooms keyed by id',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'success': {'type': 'boolean', 'example': True},
+                    'data': {
+                        'type': 'object',
+                        'additionalProperties': {'$ref': '#/definitions/Room'}
+                    },
+                    'missing': {
+                        'type': 'array',
+                        'items': {'type': 'integer'}
+                    }
+                }
+            }
+        },
+        400: {'description': 'Bad request - Invalid or too many ids'},
+        500: {'description': 'Internal server error'}
+    }
+})
+@coalesced
+@read_from_replica
+def get_rooms_batch():
+    try:
+        raw_ids = request.args.get('ids', '')
+        try:
+            # dict.fromkeys elimina duplicados conservando el orden
+            room_ids = list(dict.fromkeys(int(value) for value in raw_ids.split(',') if value.strip()))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'ids must be a comma separated list of integers'}), 400
+
+        if not room_ids:
+            return jsonify({'success': False, 'error': 'ids parameter is required'}), 400
+        if len(room_ids) > MAX_BATCH_IDS:
+            return jsonify({'success': False, 'error': f'Too many ids, maximum is {MAX_BATCH_IDS}'}), 400
+        fields = requested_fields(ROOM_FIELDS)
+
+        # Las salas ya cacheadas por get_room no se vuelven a consultar
+        found = {}
+        for room_id in room_ids:
+            cached = catalog_cache.get(('room', room_id))
+            if cached is not MISSING:
+                found[room_id] = project(cached, fields)
+
+        pending = [room_id for room_id in room_ids if room_id not in found]
+        if pending:
+            # Solo las salas completas se guardan en la caché que comparte con get_room
+            complete = fields == ROOM_FIELDS
+            for room in db.session.query(*model_columns(Room, fields)).filter(Room.id.in_(pending)):
+                found[room.id] = serialize_room(room, fields)
+                if complete:
+                    catalog_cache.set(('room', room.id), found[room.id], ROOM_CACHE_TTL)
+
         return jsonify({
             'success': True,
-            'data': [{
-                'id': room.id,
-                'name': room.name,
-                'capacity': room.capacity,
-                'screen_type': room.screen_type,
-                'is_active': room.is_active,
-                'created_at': room.created_at.isoformat()
-            } for room in rooms]
+            'data': {str(room_id): found[room_id] for room_id in room_ids if room_id in found},
+            'missing': [room_id for room_id in room_ids if room_id not in found]
         })
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/rooms/stats', methods=['GET'])
+@swag_from({
+    'tags': ['Rooms'],
+    'summary': 'Seat and schedule statistics per room',
+    'description': 'Seat counts by type, available seats and active schedule counts for every active room, computed by the database in a single aggregate query',
+    'parameters': [
+        {'name': 'room_id', 'in': 'query', 'type': 'integer', 'description': 'Restrict to one room'},
+        {'name': 'from', 'in': 'query', 'type': 'string', 'format': 'date-time', 'description': 'Only count schedules from this show time'},
+        {'name': 'to', 'in': 'query', 'type': 'string', 'format': 'date-time', 'description': 'Only count schedules before this show time'},
+        {'name': 'include_schedule_ids', 'in': 'query', 'type': 'boolean', 'description': 'Also list the ids of the counted schedules per room'}
+    ],
+    'responses': {
+        200: {'description': 'Statistics retrieved successfully'},
+        400: {'description': 'Bad request - Invalid time window'},
+        500: {'description': 'Internal server error'}
+    }
+})
+@coalesced
+@read_from_replica
+@low_priority
+def get_rooms_stats():
+    try:
+        room_id = request.args.get('room_id', type=int)
+        time_filters, _ = schedule_time_filters(default_upcoming=False)
+        schedule_filters = [Schedule.is_active.is_(True), *time_filters]
+        
+        def count_if(condition):
+            return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+        
+        seat_stats = db.select(
+            Seat.room_id,
+            db.func.count(Seat.id).label('total'),
+            count_if(Seat.is_available.is_(True)).label('available'),
+            count_if(Seat.seat_type == 'regular').label('regular'),
+            count_if(Seat.seat_type == 'premium').label('premium'),
+            count_if(Seat.seat_type == 'vip').label('vip')
+        ).group_by(Seat.room_id).subquery()
+        schedule_stats = db.select(
+            Schedule.room_id,
+            db.func.count(Schedule.id).label('schedules')
+        ).where(*schedule_filters).group_by(Schedule.room_id).subquery()
+        
+        # Una sola sentencia: salas activas unidas a los agregados de asientos y horarios
+        query = db.select(
+            Room.id, Room.name, Room.capacity, Room.screen_type,
+            db.func.coalesce(seat_stats.c.total, 0).label('seats_total'),
+            db.func.coalesce(seat_stats.c.available, 0).label('seats_available'),
+            db.func.coalesce(seat_stats.c.regular, 0).label('regular'),
+            db.func.coalesce(seat_stats.c.premium, 0).label('premium'),
+            db.func.coalesce(seat_stats.c.vip, 0).label('vip'),
+            db.func.coalesce(schedule_stats.c.schedules, 0).label('active_schedules')
+        ).outerjoin(seat_stats, seat_stats.c.room_id == Room.id) \
+            .outerjoin(schedule_stats, schedule_stats.c.room_id == Room.id) \
+            .where(Room.is_active.is_(True)).order_by(Room.id)
+        if room_id:
+            query = query.where(Room.id == room_id)
+        
+        stats = [{
+            'room_id': row.id,
+            'name': row.name,
+            'capacity': row.capacity,
+            'screen_type': row.screen_type,
+            'seats': {
+                'total': int(row.seats_total),
+                'available': int(row.seats_available),
+                'by_type': {'regular': int(row.regular), 'premium': int(row.premium), 'vip': int(row.vip)}
+            },
+            'active_schedules': int(row.active_schedules)
+        } for row in db.session.execute(query)]
+        
+        if request.args.get('include_schedule_ids', '').lower() in ('1', 'true'):
+            ids_query = db.select(Schedule.room_id, Schedule.id).where(*schedule_filters)
+            if room_id:
+                ids_query = ids_query.where(Schedule.room_id == room_id)
+            schedule_ids = {}
+            for row in db.session.execute(ids_query):
+                schedule_ids.setdefault(row.room_id, []).append(row.id)
+            for room_stats in stats:
+                room_stats['schedule_ids'] = schedule_ids.get(room_stats['room_id'], [])
+        
+        return jsonify({'success': True, 'data': stats})
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/rooms/<int:room_id>', methods=['GET'])
+@bp.route('/api/rooms/<int:room_id>', methods=['GET'])
+@coalesced
+@read_from_replica
 def get_room(room_id):
     try:
-        room = Room.query.get_or_404(room_id)
-        return jsonify({
-            'success': True,
-            'data': {
-                'id': room.id,
-                'name': room.name,
-                'capacity': room.capacity,
-                'screen_type': room.screen_type,
-                'is_active': room.is_active,
-                'created_at': room.created_at.isoformat()
-            }
-        })
+        fields = requested_fields(ROOM_FIELDS)
+        
+        def load():
+            room = Room.query.get_or_404(room_id)
+            return serialize_room(room)
+        
+        if fields == ROOM_FIELDS:
+            data = catalog_cache.get_or_set(('room', room_id), load, ROOM_CACHE_TTL)
+        else:
+            # Una selección parcial aprovecha la sala cacheada; si no está, lee solo esas columnas
+            data = catalog_cache.get(('room', room_id))
+            if data is MISSING:
+                room = db.session.query(*model_columns(Room, fields, always=())).filter(Room.id == room_id).first_or_404()
+                data = serialize_room(room, fields)
+            else:
+                data = project(data, fields)
+        return etag_response({'success': True, 'data': data}, make_etag(sorted(data.items())))
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except NotFound:
+        return jsonify({'success': False, 'error': 'Room not found'}), 404
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/rooms', methods=['POST'])
+@bp.route('/api/rooms', methods=['POST'])
 @swag_from({
     'tags': ['Rooms'],
     'summary': 'Create a new room',
@@ -295,47 +724,159 @@ def create_room():
         room = Room(**data)
         db.session.add(room)
         db.session.commit()
+        catalog_cache.invalidate_prefix('rooms')
+        index_room(room)
         
         return jsonify({
             'success': True,
-            'data': {
-                'id': room.id,
-                'name': room.name,
-                'capacity': room.capacity,
-                'screen_type': room.screen_type,
-                'is_active': room.is_active,
-                'created_at': room.created_at.isoformat()
-            }
+            'data': serialize_room(room)
         }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Rutas para Asientos
-@app.route('/api/rooms/<int:room_id>/seats', methods=['GET'])
+@bp.route('/api/rooms/<int:room_id>/seats', methods=['GET'])
+@coalesced
+@read_from_replica
 def get_room_seats(room_id):
     try:
         limit = request.args.get('limit', default=1000, type=int)
         offset = request.args.get('offset', default=0, type=int)
         
-        room = Room.query.get_or_404(room_id)
-        seats = Seat.query.filter_by(room_id=room_id).limit(limit).offset(offset).all()
+        cursor = request.args.get('cursor')
+        fields = requested_fields(SEAT_FIELDS)
+        
+        def load():
+            Room.query.get_or_404(room_id)
+            query = db.session.query(*model_columns(Seat, fields)).filter_by(room_id=room_id)
+            seats, next_cursor = paginate_by_id(query, Seat.id, f'seats:{room_id}', limit, offset)
+            return {
+                'success': True,
+                'data': [serialize_seat(seat, fields) for seat in seats],
+                'next_cursor': next_cursor
+            }
+        
+        return conditional_get(lambda: seats_version(room_id), load, ('seats', room_id, limit, offset, cursor, fields), SEAT_CACHE_TTL)
+    except NotFound:
+        return jsonify({'success': False, 'error': 'Room not found'}), 404
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': f'Invalid cursor: {e}'}), 400
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def layout_rows(room_id, layout):
+    return [
+        {'room_id': room_id, 'row_number': row_number, 'seat_number': seat_number, 'seat_type': seat_type}
+        for row_number, seat_number, seat_type in layout
+    ]
+
+def insert_seats(seats):
+    """Inserta todos los asientos con un único INSERT multi-fila (executemany) en vez de un add() por asiento.
+
+    Cada asiento nuevo recibe la siguiente posición libre de su sala, en el orden de ``seats``.
+    Las posiciones existentes no se renumeran: los bitmaps de ``schedule_seatmaps`` y las
+    posiciones de ``seat_holds`` siguen apuntando a los mismos asientos aunque se añadan otros
+    en medio del layout. Si otra petición añade asientos a la misma sala a la vez, UNIQUE
+    (room_id, position) hace fallar una de las dos con IntegrityError.
+    """
+    if not seats:
+        return
+    room_ids = {seat['room_id'] for seat in seats}
+    next_position = dict(db.session.query(Seat.room_id, db.func.max(Seat.position) + 1)
+                         .filter(Seat.room_id.in_(room_ids)).group_by(Seat.room_id).all())
+    rows = []
+    for seat in seats:
+        position = next_position.get(seat['room_id']) or 0
+        next_position[seat['room_id']] = position + 1
+        rows.append(dict(seat, position=position))
+    db.session.execute(db.insert(Seat), rows)
+
+@bp.route('/api/seat-layouts', methods=['GET'])
+def get_seat_layouts():
+    return jsonify({
+        'success': True,
+        'data': [{
+            'name': name,
+            'description': template['description'],
+            'seats_per_row': template['seats_per_row'],
+            'bands': [{'seat_type': seat_type, 'rows': rows} for seat_type, rows in template['bands']],
+            'default_type': template.get('default_type', 'regular')
+        } for name, template in SEAT_LAYOUT_TEMPLATES.items()]
+    })
+
+@bp.route('/api/seat-layouts/<template>/apply', methods=['POST'])
+@swag_from({
+    'tags': ['Seats'],
+    'summary': 'Apply a layout template to several rooms',
+    'description': 'Generate the seats of every listed room from a named layout template in a single bulk insert. Rooms that already have seats are skipped',
+    'parameters': [
+        {'name': 'template', 'in': 'path', 'type': 'string', 'required': True, 'enum': list(SEAT_LAYOUT_TEMPLATES)},
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'room_ids': {'type': 'array', 'items': {'type': 'integer'}},
+                    'seats_per_row': {'type': 'integer'}
+                }
+            }
+        }
+    ],
+    'responses': {
+        201: {'description': 'Seats created'},
+        400: {'description': 'Bad request - Invalid input'},
+        404: {'description': 'Template not found'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def apply_seat_layout(template):
+    try:
+        if template not in SEAT_LAYOUT_TEMPLATES:
+            return jsonify({'success': False, 'error': f'Unknown layout template: {template}'}), 404
+        data = request.get_json() or {}
+        room_ids = data.get('room_ids') or []
+        if not room_ids or len(room_ids) > MAX_BATCH_IDS:
+            return jsonify({'success': False, 'error': f'room_ids must contain between 1 and {MAX_BATCH_IDS} ids'}), 400
+        seats_per_row = data.get('seats_per_row') or SEAT_LAYOUT_TEMPLATES[template]['seats_per_row']
+        
+        rooms = db.session.query(Room.id, Room.capacity).filter(Room.id.in_(room_ids)).all()
+        seated = {row.room_id for row in db.session.query(Seat.room_id).filter(Seat.room_id.in_(room_ids)).distinct()}
         
+        seats, created = [], {}
+        for room in rooms:
+            if room.id in seated:
+                continue
+            room_seats = layout_rows(room.id, build_layout(template, rows_for_capacity(room.capacity, seats_per_row), seats_per_row))
+            seats.extend(room_seats)
+            created[str(room.id)] = len(room_seats)
+        
+        insert_seats(seats)
+        db.session.commit()
+        for room_id in created:
+            catalog_cache.invalidate_prefix('seats', int(room_id))
+        
+        found = {room.id for room in rooms}
         return jsonify({
             'success': True,
-            'data': [{
-                'id': seat.id,
-                'room_id': seat.room_id,
-                'row_number': seat.row_number,
-                'seat_number': seat.seat_number,
-                'seat_type': seat.seat_type,
-                'is_available': seat.is_available
-            } for seat in seats]
-        })
+            'data': {
+                'created': created,
+                'skipped': sorted(seated),
+                'missing': [room_id for room_id in room_ids if room_id not in found]
+            }
+        }), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Seats were added concurrently to one of the rooms, retry'}), 409
     except Exception as e:
+        db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/rooms/<int:room_id>/seats', methods=['POST'])
+@bp.route('/api/rooms/<int:room_id>/seats', methods=['POST'])
 @swag_from({
     'tags': ['Seats'],
     'summary': 'Create seats for a room',
@@ -361,7 +902,12 @@ def get_room_seats(room_id):
                     },
                     'seats_per_row': {
                         'type': 'integer',
-                        'description': 'Seats per row for auto-generation (default: 10)'
+                        'description': 'Seats per row for auto-generation (default: 10, or the template value)'
+                    },
+                    'template': {
+                        'type': 'string',
+                        'enum': list(SEAT_LAYOUT_TEMPLATES),
+                        'description': 'Layout template for auto-generation (default: standard)'
                     },
                     'seats': {
                         'type': 'array',
@@ -389,69 +935,162 @@ def create_seats(room_id):
         
         # Crear asientos automáticamente basado en la capacidad
         if 'auto_generate' in data and data['auto_generate']:
-            seats_per_row = data.get('seats_per_row', 10)
-            rows = room.capacity // seats_per_row
+            template = data.get('template', 'standard')
+            if template not in SEAT_LAYOUT_TEMPLATES:
+                return jsonify({'success': False, 'error': f'Unknown layout template: {template}'}), 400
+            seats_per_row = data.get('seats_per_row') or SEAT_LAYOUT_TEMPLATES[template]['seats_per_row']
             
-            for row in range(1, rows + 1):
-                for seat_num in range(1, seats_per_row + 1):
-                    seat = Seat(
-                        room_id=room_id,
-                        row_number=chr(64 + row),  # A, B, C, etc.
-                        seat_number=seat_num,
-                        seat_type='regular'
-                    )
-                    db.session.add(seat)
+            layout = build_layout(template, rows_for_capacity(room.capacity, seats_per_row), seats_per_row)
+            seats = layout_rows(room_id, layout)
         else:
-            # Crear asientos individuales
-            for seat_data in data['seats']:
-                errors = seat_schema.validate(seat_data)
-                if errors:
-                    return jsonify({'success': False, 'error': 'Validation error', 'details': errors}), 400
-                
-                seat = Seat(room_id=room_id, **seat_data)
-                db.session.add(seat)
+            # Crear asientos individuales: se validan todos antes de insertar
+            errors = seats_schema.validate(data['seats'])
+            if errors:
+                return jsonify({'success': False, 'error': 'Validation error', 'details': errors}), 400
+            
+            seats = [dict(seat_data, room_id=room_id) for seat_data in data['seats']]
         
+        insert_seats(seats)
         db.session.commit()
-        return jsonify({'success': True, 'message': 'Seats created successfully'}), 201
+        catalog_cache.invalidate_prefix('seats', room_id)
+        return jsonify({'success': True, 'message': 'Seats created successfully', 'created': len(seats)}), 201
+    except NotFound:
+        return jsonify({'success': False, 'error': 'Room not found'}), 404
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Some seats already exist or were added concurrently, retry'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Rutas para Horarios
-@app.route('/api/schedules', methods=['GET'])
+class InvalidFilter(ValueError):
+    pass
+
+def schedule_time_filters(default_upcoming=True):
+    """Filtros sobre show_time a partir de ``from``/``to`` (ISO 8601, ``to`` exclusivo).
+
+    Si no se envía ``from`` y ``default_upcoming`` es True, solo se devuelven funciones futuras
+    salvo que el cliente pida ``upcoming=false``. Devuelve (filtros, ventana); la ventana forma
+    parte del ETag porque "ahora" avanza aunque la tabla no cambie.
+    """
+    args = request.args
+    try:
+        window_from = datetime.fromisoformat(args['from']) if args.get('from') else None
+        window_to = datetime.fromisoformat(args['to']) if args.get('to') else None
+    except ValueError:
+        raise InvalidFilter('from/to must be ISO 8601 datetimes')
+    
+    if window_from is None and default_upcoming and args.get('upcoming', 'true').lower() not in ('0', 'false'):
+        window_from = datetime.now().replace(second=0, microsecond=0)
+    
+    filters = []
+    if window_from:
+        filters.append(Schedule.show_time >= window_from)
+    if window_to:
+        filters.append(Schedule.show_time < window_to)
+    return filters, (window_from, window_to)
+
+def requested_movie_ids():
+    """``movie_ids`` admite valores separados por comas y/o repetidos (?movie_ids=a,b&movie_ids=c)."""
+    movie_ids = list(dict.fromkeys(
+        value.strip() for raw in request.args.getlist('movie_ids') for value in raw.split(',') if value.strip()
+    ))
+    if len(movie_ids) > MAX_BATCH_IDS:
+        raise InvalidFilter(f'Too many movie_ids, maximum is {MAX_BATCH_IDS}')
+    return movie_ids
+
+# Campos de los listados de horarios que vienen de la sala
+SCHEDULE_ROOM_COLUMNS = {
+    'room_name': Room.name,
+    'room_capacity': Room.capacity
+}
+
+def schedule_row_columns(fields):
+    """Columnas para serializar ``fields`` y si hace falta unir la sala.
+
+    ``id`` y ``show_time`` se seleccionan siempre porque forman el cursor de paginación.
+    """
+    columns = {'id': Schedule.id, 'show_time': Schedule.show_time}
+    for field in fields:
+        room_column = SCHEDULE_ROOM_COLUMNS.get(field)
+        columns[field] = room_column.label(field) if room_column is not None else getattr(Schedule, field)
+    return list(columns.values()), any(field in SCHEDULE_ROOM_COLUMNS for field in fields)
+
+def schedule_rows_query(fields):
+    """Consulta de horarios como tuplas (sin objetos ORM) con solo las columnas de ``fields``.
+
+    La sala se une en la misma consulta (sin carga perezosa de ``schedule.room`` fila a fila)
+    y solo si se pide alguno de sus campos.
+    """
+    columns, join_room = schedule_row_columns(fields)
+    query = db.session.query(*columns)
+    return query.join(Room, Room.id == Schedule.room_id) if join_room else query
+
+@bp.route('/api/schedules', methods=['GET'])
+@coalesced
+@read_from_replica
+@low_priority
 def get_schedules():
     try:
         movie_id = request.args.get('movie_id')
+        movie_ids = requested_movie_ids()
         room_id = request.args.get('room_id')
         limit = request.args.get('limit', default=1000, type=int)
         offset = request.args.get('offset', default=0, type=int)
+        stream = wants_ndjson()
+        time_filters, window = schedule_time_filters()
+        fields = requested_fields(SCHEDULE_LIST_FIELDS)
         
-        query = Schedule.query.filter_by(is_active=True)
+        # Una sola consulta que selecciona solo las columnas serializadas
+        query = schedule_rows_query(fields).filter(Schedule.is_active.is_(True), *time_filters)
         
         if movie_id:
-            query = query.filter_by(movie_id=movie_id)
+            movie_ids.append(movie_id)
+        if movie_ids:
+            query = query.filter(Schedule.movie_id.in_(movie_ids))
         if room_id:
-            query = query.filter_by(room_id=room_id)
+            query = query.filter(Schedule.room_id == room_id)
         
-        # Apply pagination
-        schedules = query.limit(limit).offset(offset).all()
+        def serialize(schedule):
+            return serialize_schedule(schedule, fields)
         
-        return jsonify({
-            'success': True,
-            'data': [{
-                'id': schedule.id,
-                'movie_id': schedule.movie_id,
-                'room_id': schedule.room_id,
-                'show_time': schedule.show_time.isoformat(),
-                'price': float(schedule.price),
-                'is_active': schedule.is_active,
-                'room_name': schedule.room.name
-            } for schedule in schedules]
-        })
+        # Paginación keyset sobre (show_time, id), apoyada en idx_schedules_time
+        query = query.order_by(Schedule.show_time, Schedule.id)
+        cursor = request.args.get('cursor')
+        if cursor:
+            last_show_time, last_id = decode_cursor('schedules', cursor, datetime.fromisoformat, int)
+            query = query.filter(db.or_(
+                Schedule.show_time > last_show_time,
+                db.and_(Schedule.show_time == last_show_time, Schedule.id > last_id)
+            ))
+        else:
+            query = query.offset(offset)
+        
+        if stream:
+            # En modo streaming solo se limita si el cliente lo pide explícitamente
+            if 'limit' in request.args:
+                query = query.limit(limit)
+            return ndjson_response(query, serialize)
+        
+        def load():
+            schedules = query.limit(limit).all()
+            last = schedules[-1] if schedules and len(schedules) == limit else None
+            return {
+                'success': True,
+                'data': [serialize(schedule) for schedule in schedules],
+                'next_cursor': encode_cursor('schedules', last.show_time, last.id) if last else None
+            }
+        
+        return conditional_get(lambda: schedules_version() + window, load)
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'error': f'Invalid cursor: {e}'}), 400
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/schedules', methods=['POST'])
+@bp.route('/api/schedules', methods=['POST'])
 @swag_from({
     'tags': ['Schedules'],
     'summary': 'Create a new schedule',
@@ -481,48 +1120,902 @@ def create_schedule():
         schedule = Schedule(**data)
         db.session.add(schedule)
         db.session.commit()
+        index_schedule(schedule)
+        
+        return jsonify({
+            'success': True,
+            'data': serialize_schedule(schedule)
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Alta masiva de horarios
+def local_naive(value):
+    """DATETIME sin zona ni fracciones, como se guarda en MySQL: ``show_time`` va en hora local del servidor.
+
+    Una fecha con zona (``...+05:00``) se convierte a la hora local antes de quitarle la zona,
+    en lugar de conservar su hora de reloj.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+def schedule_end(show_time, duration_minutes):
+    """Fin de la ocupación de la sala: duración más el margen de limpieza."""
+    return show_time + timedelta(minutes=duration_minutes + SCHEDULE_CLEANUP_MINUTES)
+
+def load_room_timeline(room_id, window_start, window_end):
+    """Una consulta de rango por sala con los horarios que pueden chocar con [window_start, window_end).
+
+    Como ninguna función ocupa la sala más de ``MAX_SCHEDULE_SPAN``, solo pueden solapar los
+    horarios que empiezan en [window_start - MAX_SCHEDULE_SPAN, window_end); en memoria se
+    comprueban con ``RoomIntervals`` (bisect sobre los inicios) en lugar de recorrerlos todos.
+
+    ``FOR UPDATE`` bloquea ese rango del índice (room_id, show_time) hasta el commit, así
+    que dos altas masivas concurrentes sobre la misma sala no pueden solaparse entre sí.
+    Los horarios inactivos no ocupan la sala pero siguen sujetos a UNIQUE (room_id, show_time).
+    """
+    timeline, taken_times = RoomIntervals(), set()
+    rows = db.session.query(Schedule.id, Schedule.show_time, Schedule.duration_minutes, Schedule.is_active).filter(
+        Schedule.room_id == room_id,
+        Schedule.show_time >= window_start - MAX_SCHEDULE_SPAN,
+        Schedule.show_time < window_end
+    ).with_for_update().all()
+    for row in rows:
+        taken_times.add(row.show_time)
+        if row.is_active:
+            timeline.add({'schedule_id': row.id}, row.show_time, schedule_end(row.show_time, row.duration_minutes))
+    return timeline, taken_times
+
+@bp.route('/api/schedules/bulk', methods=['POST'])
+@swag_from({
+    'tags': ['Schedules'],
+    'summary': 'Create many schedules at once',
+    'description': (
+        'Validates the whole batch in one pass: overlaps (running time plus cleanup margin) are checked '
+        'within the batch and against existing schedules with one range query per room, and the accepted '
+        'items are inserted with a single multi-row statement. Each item gets its own result; when two '
+        'items of the batch overlap, the first one wins'
+    ),
+    'parameters': [{
+        'name': 'body',
+        'in': 'body',
+        'required': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'schedules': {
+                    'type': 'array',
+                    'items': {'$ref': '#/definitions/Schedule'}
+                }
+            }
+        }
+    }],
+    'responses': {
+        201: {'description': 'All schedules created'},
+        207: {'description': 'Some items were rejected, see data.results[].status (invalid or conflict)'},
+        400: {'description': 'Bad request - Body is not a list of schedules or exceeds the limit'},
+        409: {'description': 'A concurrent write took one of the slots, nothing was inserted'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def create_schedules_bulk():
+    try:
+        items = (request.get_json(silent=True) or {}).get('schedules')
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': 'schedules must be a non-empty list'}), 400
+        if len(items) > MAX_BULK_SCHEDULES:
+            return jsonify({'success': False, 'error': f'Too many schedules, maximum is {MAX_BULK_SCHEDULES}'}), 400
+        
+        results = [None] * len(items)
+        candidates = []
+        for index, item in enumerate(items):
+            try:
+                data = schedule_schema.load(item if isinstance(item, dict) else {})
+            except ValidationError as e:
+                results[index] = {'index': index, 'status': 'invalid', 'details': e.messages}
+                continue
+            data['show_time'] = local_naive(data['show_time'])
+            data.setdefault('duration_minutes', DEFAULT_SCHEDULE_DURATION)
+            candidates.append((index, data))
+        
+        room_ids = {data['room_id'] for _, data in candidates}
+        active_rooms = {room_id for room_id, in db.session.query(Room.id).filter(Room.id.in_(room_ids), Room.is_active.is_(True))}
+        
+        by_room = {}
+        for index, data in candidates:
+            if data['room_id'] not in active_rooms:
+                results[index] = {'index': index, 'status': 'invalid', 'details': {'room_id': ['Room not found']}}
+            else:
+                by_room.setdefault(data['room_id'], []).append((index, data))
+        
+        accepted = []
+        for room_id, room_items in by_room.items():
+            starts = [data['show_time'] for _, data in room_items]
+            window_end = max(schedule_end(data['show_time'], data['duration_minutes']) for _, data in room_items)
+            timeline, taken_times = load_room_timeline(room_id, min(starts), window_end)
+            
+            # En orden de la petición: lo ya aceptado del lote cuenta como ocupado para los siguientes
+            for index, data in room_items:
+                start = data['show_time']
+                end = schedule_end(start, data['duration_minutes'])
+                conflicts = [origin for _, _, origin in timeline.overlapping(start, end)]
+                if start in taken_times and not conflicts:
+                    conflicts = [{'reason': 'show_time already used by an inactive schedule'}]
+                if conflicts:
+                    results[index] = {'index': index, 'status': 'conflict', 'conflicts_with': conflicts}
+                    continue
+                timeline.add({'index': index}, start, end)
+                taken_times.add(start)
+                accepted.append((index, data))
+        
+        if accepted:
+            db.session.execute(db.insert(Schedule), [data for _, data in accepted])
+            keys = [(data['room_id'], data['show_time']) for _, data in accepted]
+            ids = dict(((room_id, show_time), schedule_id) for schedule_id, room_id, show_time in db.session.query(
+                Schedule.id, Schedule.room_id, Schedule.show_time
+            ).filter(db.tuple_(Schedule.room_id, Schedule.show_time).in_(keys)))
+            for index, data in accepted:
+                results[index] = {'index': index, 'status': 'created', 'id': ids.get((data['room_id'], data['show_time']))}
+        db.session.commit()
+        for index, data in accepted:
+            index_schedule(SimpleNamespace(id=results[index]['id'], is_active=True, **data))
         
         return jsonify({
             'success': True,
             'data': {
-                'id': schedule.id,
-                'movie_id': schedule.movie_id,
-                'room_id': schedule.room_id,
-                'show_time': schedule.show_time.isoformat(),
-                'price': float(schedule.price),
-                'is_active': schedule.is_active
+                'created': len(accepted),
+                'rejected': len(items) - len(accepted),
+                'results': results
             }
-        }), 201
+        }), 201 if len(accepted) == len(items) else 207
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'A schedule slot was taken concurrently, retry the batch'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/schedules/movie/<movie_id>', methods=['GET'])
-def get_schedules_by_movie(movie_id):
+# Disponibilidad de salas (índice en memoria, ver availability.py)
+def index_room(room):
+    if availability_index.loaded:
+        availability_index.upsert_room(
+            room.id, name=room.name, capacity=room.capacity, screen_type=room.screen_type, is_active=room.is_active
+        )
+
+def index_schedule(schedule):
+    if availability_index.loaded and schedule.id is not None:
+        availability_index.upsert_schedule(
+            schedule.id, schedule.room_id, schedule.show_time,
+            schedule_end(schedule.show_time, schedule.duration_minutes), schedule.is_active
+        )
+
+# since: inicio de la cobertura del índice; las ventanas anteriores no se pueden responder con él
+availability_sync = {'at': 0.0, 'rooms': None, 'schedules': None, 'since': None}
+# Solo un hilo por proceso consulta la base de datos para refrescar el índice
+availability_refresh = Lock()
+
+def changed_since(query, column, watermark):
+    """Filas con ``column`` posterior a la marca menos el solape; sin marca, todas."""
+    if watermark is None:
+        return query
+    return query.filter(column >= watermark - timedelta(seconds=AVAILABILITY_SYNC_OVERLAP_SECONDS))
+
+def latest(rows, watermark):
+    return max(filter(None, [watermark, *(row.updated_at for row in rows)]), default=None)
+
+def sync_availability():
+    """Carga el índice la primera vez; después trae cada ``AVAILABILITY_REFRESH_SECONDS`` las filas
+    cambiadas por otros workers o servicios (las de este proceso se aplican al momento con
+    ``index_room``/``index_schedule``).
+
+    Las consultas se hacen sin el cerrojo del índice, que solo se toma para aplicar el resultado,
+    así que las búsquedas no esperan a la base de datos; mientras un hilo refresca, los demás
+    responden con el índice actual. La marca de ``updated_at`` se aplica con un solape de
+    ``AVAILABILITY_SYNC_OVERLAP_SECONDS``: una transacción que escribe su ``updated_at`` y confirma
+    más tarde sigue entrando en el siguiente refresco. Las filas repetidas entre refrescos se
+    deduplican por id y reaplicarlas es inocuo. Si un refresco lee una fila justo antes de que
+    este proceso la cambie, el siguiente refresco la corrige.
+    """
+    def fresh():
+        return availability_index.loaded and time.monotonic() - availability_sync['at'] < AVAILABILITY_REFRESH_SECONDS
+    
+    if fresh() or not availability_refresh.acquire(blocking=not availability_index.loaded):
+        return
+    try:
+        if fresh():
+            return
+        rooms = db.session.query(Room.id, Room.name, Room.capacity, Room.screen_type, Room.is_active, Room.updated_at)
+        schedules = db.session.query(
+            Schedule.id, Schedule.room_id, Schedule.show_time, Schedule.duration_minutes, Schedule.is_active, Schedule.updated_at
+        )
+        if not availability_index.loaded:
+            horizon = datetime.now().replace(microsecond=0) - timedelta(days=AVAILABILITY_HORIZON_DAYS)
+            # También las funciones que empezaron antes del horizonte pero siguen ocupando la sala en él
+            schedules = schedules.filter(Schedule.is_active.is_(True), Schedule.show_time >= horizon - MAX_SCHEDULE_SPAN)
+        else:
+            rooms = changed_since(rooms, Room.updated_at, availability_sync['rooms'])
+            schedules = changed_since(schedules, Schedule.updated_at, availability_sync['schedules'])
+        rooms = list({room.id: room for room in rooms}.values())
+        schedules = list({schedule.id: schedule for schedule in schedules}.values())
+        
+        room_entries = [
+            (room.id, {'name': room.name, 'capacity': room.capacity, 'screen_type': room.screen_type, 'is_active': room.is_active})
+            for room in rooms
+        ]
+        if not availability_index.loaded:
+            availability_index.replace(room_entries, [
+                (schedule.id, schedule.room_id, schedule.show_time, schedule_end(schedule.show_time, schedule.duration_minutes))
+                for schedule in schedules
+            ])
+            availability_sync['since'] = horizon
+        else:
+            with availability_index.lock:
+                for room_id, attributes in room_entries:
+                    availability_index.upsert_room(room_id, **attributes)
+                for schedule in schedules:
+                    availability_index.upsert_schedule(
+                        schedule.id, schedule.room_id, schedule.show_time,
+                        schedule_end(schedule.show_time, schedule.duration_minutes), schedule.is_active
+                    )
+        availability_sync['rooms'] = latest(rooms, availability_sync['rooms'])
+        availability_sync['schedules'] = latest(schedules, availability_sync['schedules'])
+        availability_sync['at'] = time.monotonic()
+    finally:
+        availability_refresh.release()
+
+@bp.route('/api/rooms/availability', methods=['GET'])
+@swag_from({
+    'tags': ['Rooms'],
+    'summary': 'Find rooms that are free in a time window',
+    'description': (
+        'Answered from an in-memory interval index of schedules (running time plus cleanup margin), '
+        'refreshed from the database every few seconds. Without min_minutes a room must be free for the '
+        'whole window; with it, rooms with at least one free gap of that length are returned. The index only '
+        'holds schedules from AVAILABILITY_HORIZON_DAYS before the worker started onwards, so a window starting '
+        'earlier is rejected with 400. Datetimes with an offset are converted to server local time'
+    ),
+    'parameters': [
+        {'name': 'from', 'in': 'query', 'type': 'string', 'format': 'date-time', 'required': True},
+        {'name': 'to', 'in': 'query', 'type': 'string', 'format': 'date-time', 'required': True, 'description': 'Exclusive'},
+        {'name': 'screen_type', 'in': 'query', 'type': 'string', 'enum': ['2D', '3D', 'IMAX']},
+        {'name': 'min_capacity', 'in': 'query', 'type': 'integer'},
+        {'name': 'min_minutes', 'in': 'query', 'type': 'integer', 'description': 'Minimum length of a free slot'}
+    ],
+    'responses': {
+        200: {
+            'description': 'Available rooms with their free slots inside the window',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'success': {'type': 'boolean', 'example': True},
+                    'data': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'room_id': {'type': 'integer'},
+                                'name': {'type': 'string'},
+                                'capacity': {'type': 'integer'},
+                                'screen_type': {'type': 'string'},
+                                'free_slots': {
+                                    'type': 'array',
+                                    'items': {
+                                        'type': 'object',
+                                        'properties': {
+                                            'from': {'type': 'string', 'format': 'date-time'},
+                                            'to': {'type': 'string', 'format': 'date-time'}
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        400: {'description': 'Bad request - Missing or invalid window, or window starts before the indexed range'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_rooms_availability():
     try:
-        schedules = Schedule.query.filter_by(movie_id=movie_id, is_active=True).all()
+        try:
+            window_from = local_naive(datetime.fromisoformat(request.args['from']))
+            window_to = local_naive(datetime.fromisoformat(request.args['to']))
+        except (KeyError, ValueError):
+            return jsonify({'success': False, 'error': 'from and to are required ISO 8601 datetimes'}), 400
+        if window_to <= window_from:
+            return jsonify({'success': False, 'error': 'to must be after from'}), 400
+        min_capacity = request.args.get('min_capacity', type=int)
+        min_minutes = request.args.get('min_minutes', type=int)
         
+        sync_availability()
+        since = availability_sync['since']
+        if since is not None and window_from < since:
+            return jsonify({
+                'success': False,
+                'error': f'from must be {since.isoformat()} or later, older schedules are not in the availability index'
+            }), 400
+        rooms = availability_index.search(
+            window_from, window_to,
+            screen_type=request.args.get('screen_type'),
+            min_capacity=min_capacity,
+            min_length=timedelta(minutes=min_minutes) if min_minutes else None
+        )
         return jsonify({
             'success': True,
             'data': [{
-                'id': schedule.id,
-                'movie_id': schedule.movie_id,
-                'room_id': schedule.room_id,
-                'show_time': schedule.show_time.isoformat(),
-                'price': float(schedule.price),
-                'room_name': schedule.room.name,
-                'room_capacity': schedule.room.capacity
-            } for schedule in schedules]
+                'room_id': room_id,
+                'name': room['name'],
+                'capacity': room['capacity'],
+                'screen_type': room['screen_type'],
+                'free_slots': [{'from': start, 'to': end} for start, end in slots]
+            } for room_id, room, slots in rooms]
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def warm_availability(app):
+    """Carga el índice de disponibilidad al arrancar un worker; si falla se cargará en la primera consulta."""
+    with app.app_context():
+        try:
+            sync_availability()
+        except Exception as e:
+            app.logger.warning('Availability index not loaded at startup: %s', e)
+
+@bp.route('/api/schedules/movie/<movie_id>', methods=['GET'])
+@coalesced
+@read_from_replica
+@low_priority
+def get_schedules_by_movie(movie_id):
+    try:
+        limit = request.args.get('limit', default=1000, type=int)
+        time_filters, window = schedule_time_filters()
+        fields = requested_fields(MOVIE_SCHEDULE_FIELDS)
+        
+        def load():
+            schedules = schedule_rows_query(fields) \
+                .filter(Schedule.movie_id == movie_id, Schedule.is_active.is_(True), *time_filters) \
+                .order_by(Schedule.show_time, Schedule.id).limit(limit).all()
+            return {
+                'success': True,
+                'data': [serialize_schedule(schedule, fields) for schedule in schedules]
+            }
+        
+        return conditional_get(lambda: schedules_version() + window, load)
+    except InvalidFilter as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Mapa de asientos por horario
+class SeatMapBusy(Exception):
+    pass
+
+def room_layout(room_id):
+    """Layout de la sala (asientos por fila y número) con la posición fija de cada asiento en el bitmap.
+
+    Se cachea con las demás entradas de asientos de la sala. La clave incluye el número de
+    asientos y el mayor id (una consulta agregada sobre el índice de room_id), así que un
+    worker ve los asientos que otro acaba de añadir sin esperar a que caduque su caché.
+    """
+    count, max_id = db.session.query(db.func.count(Seat.id), db.func.max(Seat.id)).filter(Seat.room_id == room_id).one()
+    
+    def load():
+        # Filas por longitud y luego por nombre: A..Z, AA, AB...; el orden de texto pondría AA entre A y B
+        seats = db.session.query(Seat.id, Seat.row_number, Seat.seat_number, Seat.seat_type, Seat.position) \
+            .filter(Seat.room_id == room_id) \
+            .order_by(db.func.length(Seat.row_number), Seat.row_number, Seat.seat_number).all()
+        size = max((seat.position for seat in seats), default=-1) + 1
+        rows, seat_ids = [], [None] * size
+        for seat in seats:
+            if not rows or rows[-1]['row'] != seat.row_number:
+                rows.append({'row': seat.row_number, 'seats': []})
+            rows[-1]['seats'].append([seat.id, seat.seat_number, seat.seat_type, seat.position])
+            seat_ids[seat.position] = seat.id
+        return {
+            'size': size,
+            'seats': len(seats),
+            'rows': rows,
+            'seat_ids': seat_ids,
+            'positions': {seat.id: seat.position for seat in seats}
+        }
+    return catalog_cache.get_or_set(('seats', room_id, 'layout', count, max_id), load, SEAT_CACHE_TTL)
+
+def available_seats(layout, bitmap):
+    return layout['seats'] - seatmap.count_set(bitmap)
+
+def update_seatmap(schedule_id, size, operation, positions, claim=None):
+    """Aplica ``operation`` (seatmap.set_bits / clear_bits) con control de concurrencia optimista.
+
+    El UPDATE solo se aplica si la versión no cambió desde la lectura; si otro proceso ganó la
+    carrera se relee y se reintenta, sin bloqueos de fila. ``claim`` se ejecuta al principio de
+    cada intento dentro de la misma transacción (p. ej. el cambio de estado de una retención)
+    y puede lanzar una excepción para abortar. Devuelve (bitmap, version).
+    """
+    for _ in range(SEATMAP_MAX_RETRIES):
+        if claim is not None:
+            claim()
+        current = db.session.query(ScheduleSeatMap.bitmap, ScheduleSeatMap.version) \
+            .filter(ScheduleSeatMap.schedule_id == schedule_id).first()
+        if current is None:
+            bitmap = operation(seatmap.empty(size), positions)
+            db.session.add(ScheduleSeatMap(schedule_id=schedule_id, bitmap=bitmap, version=1))
+            try:
+                db.session.commit()
+                return bitmap, 1
+            except IntegrityError:
+                db.session.rollback()
+                continue
+
+        bitmap = operation(seatmap.resize(current.bitmap, size), positions)
+        result = db.session.execute(
+            db.update(ScheduleSeatMap)
+            .where(ScheduleSeatMap.schedule_id == schedule_id, ScheduleSeatMap.version == current.version)
+            .values(bitmap=bitmap, version=current.version + 1, updated_at=datetime.utcnow())
+        )
+        if result.rowcount == 1:
+            db.session.commit()
+            return bitmap, current.version + 1
+        db.session.rollback()
+    raise SeatMapBusy()
+
+def schedule_room_id(schedule_id):
+    row = db.session.query(Schedule.room_id).filter(Schedule.id == schedule_id).first()
+    return row.room_id if row else None
+
+@bp.route('/api/schedules/<int:schedule_id>/seatmap', methods=['GET'])
+@swag_from({
+    'tags': ['Seats'],
+    'summary': 'Get the seat map of a schedule',
+    'description': (
+        'Room layout plus a base64 packed bitset (LSB first) where bit i is 1 when the seat at position i is held '
+        'for this schedule. Each seat is listed as [id, seat_number, seat_type, position]; positions are assigned '
+        'when seats are created and never change, so seats added later get the next free positions'
+    ),
+    'parameters': [{
+        'name': 'schedule_id',
+        'in': 'path',
+        'type': 'integer',
+        'required': True,
+        'description': 'Schedule ID'
+    }],
+    'responses': {
+        200: {'description': 'Seat map retrieved successfully'},
+        404: {'description': 'Schedule not found'},
+        500: {'description': 'Internal server error'}
+    }
+})
+def get_schedule_seatmap(schedule_id):
+    try:
+        room_id = schedule_room_id(schedule_id)
+        if room_id is None:
+            return jsonify({'success': False, 'error': 'Schedule not found'}), 404
+        
+        layout = room_layout(room_id)
+        sweep_expired_holds(schedule_id, layout['size'])
+        current = db.session.query(ScheduleSeatMap.bitmap, ScheduleSeatMap.version) \
+            .filter(ScheduleSeatMap.schedule_id == schedule_id).first()
+        bitmap = seatmap.resize(current.bitmap, layout['size']) if current else seatmap.empty(layout['size'])
+        version = current.version if current else 0
+        
+        return etag_response({
+            'success': True,
+            'data': {
+                'schedule_id': schedule_id,
+                'room_id': room_id,
+                'size': layout['size'],
+                'rows': layout['rows'],
+                'bitmap': base64.b64encode(bitmap).decode(),
+                'available': available_seats(layout, bitmap),
+                'version': version
+            }
+        }, make_etag((room_id, layout['size'], layout['seats'], version)))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+class InvalidSeats(ValueError):
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.details = details
+
+def is_int(value):
+    """Entero JSON de verdad: ``True``/``False`` son ``int`` en Python pero no posiciones ni segundos."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def int_list(data, name):
+    values = data.get(name, [])
+    if not isinstance(values, list) or not all(is_int(value) for value in values):
+        raise InvalidSeats(f'{name} must be a list of integers')
+    return values
+
+def requested_positions(layout, data):
+    """Posiciones del layout pedidas como ``seat_ids`` o ``positions``, ordenadas y sin repetir."""
+    if not isinstance(data, dict):
+        raise InvalidSeats('Request body must be a JSON object')
+    if 'seat_ids' in data:
+        seat_ids = int_list(data, 'seat_ids')
+        unknown = [seat_id for seat_id in seat_ids if seat_id not in layout['positions']]
+        if unknown:
+            raise InvalidSeats('Seats do not belong to this room', unknown)
+        positions = [layout['positions'][seat_id] for seat_id in seat_ids]
+    else:
+        positions = int_list(data, 'positions')
+        if any(not 0 <= position < layout['size'] or layout['seat_ids'][position] is None for position in positions):
+            raise InvalidSeats('positions must be seat positions of this room, see the seat map')
+    
+    positions = sorted(set(positions))
+    if not positions:
+        raise InvalidSeats('seat_ids or positions are required')
+    return positions
+
+def invalid_seats_response(e):
+    body = {'success': False, 'error': str(e)}
+    if e.details is not None:
+        body['details'] = e.details
+    return jsonify(body), 400
+
+# Retenciones de asientos con TTL
+class HoldNotActive(Exception):
+    def __init__(self, status):
+        super().__init__(f'Hold is {status}')
+        self.status = status
+
+class HoldBitsMismatch(Exception):
+    """Una retención activa no tiene a 1 todos sus bits: el bitmap y ``seat_holds`` ya no coinciden."""
+
+    def __init__(self, hold_id, positions):
+        super().__init__(f'Seat map does not match hold {hold_id}, positions not held: {positions}')
+        self.positions = positions
+
+def hold_payload(hold, layout):
+    return {
+        'hold_id': hold.id,
+        'schedule_id': hold.schedule_id,
+        'seat_ids': [layout['seat_ids'][position] for position in json.loads(hold.positions) if position < layout['size']],
+        'status': hold.status,
+        'expires_at': hold.expires_at
+    }
+
+def finish_hold(hold, size, status):
+    """Pasa una retención de ``held`` a ``released`` o ``expired`` y libera sus bits, todo en una transacción.
+
+    El UPDATE condicional sobre el estado hace de cerrojo: si otro proceso ya confirmó,
+    liberó o expiró la retención, afecta a 0 filas y no se toca el bitmap (HoldNotActive).
+    Mientras la retención está en ``held`` sus bits solo pueden pertenecerle a ella, así que se
+    borran con ``clear_bits`` estricto: si alguno ya estaba a 0 no se toca nada y se lanza
+    HoldBitsMismatch en lugar de borrar bits que ahora serían de otra retención.
+    """
+    condition = [SeatHold.id == hold.id, SeatHold.status == 'held']
+    if status == 'expired':
+        condition.append(SeatHold.expires_at <= datetime.utcnow())
+    
+    def claim():
+        result = db.session.execute(db.update(SeatHold).where(*condition).values(status=status, updated_at=datetime.utcnow()))
+        if result.rowcount != 1:
+            db.session.rollback()
+            raise HoldNotActive(db.session.get(SeatHold, hold.id, populate_existing=True).status)
+    
+    try:
+        return update_seatmap(hold.schedule_id, size, seatmap.clear_bits, json.loads(hold.positions), claim=claim)
+    except seatmap.SeatConflict as e:
+        db.session.rollback()
+        current_app.logger.error('Seat map of schedule %s does not match hold %s: %s', hold.schedule_id, hold.id, e.positions)
+        raise HoldBitsMismatch(hold.id, e.positions)
+
+def sweep_expired_holds(schedule_id=None, size=None):
+    """Libera las retenciones vencidas (de un horario o de todos); devuelve cuántas expiró este proceso."""
+    query = SeatHold.query.filter(SeatHold.status == 'held', SeatHold.expires_at <= datetime.utcnow())
+    if schedule_id is not None:
+        query = query.filter(SeatHold.schedule_id == schedule_id)
+    expired = 0
+    for hold in query.all():
+        hold_size = size if size is not None else room_layout(schedule_room_id(hold.schedule_id))['size']
+        try:
+            finish_hold(hold, hold_size, 'expired')
+            expired += 1
+        except HoldNotActive:
+            pass  # Otro proceso llegó antes
+    return expired
+
+def schedule_hold(schedule_id, hold_id):
+    hold = db.session.get(SeatHold, hold_id)
+    return hold if hold is not None and hold.schedule_id == schedule_id else None
+
+@bp.route('/api/schedules/<int:schedule_id>/holds', methods=['POST'])
+@swag_from({
+    'tags': ['Seats'],
+    'summary': 'Hold seats for a limited time',
+    'description': (
+        'Reserves the seats for ttl_seconds (default and maximum are configurable). The seat map is updated '
+        'with a version-checked conditional UPDATE, so conflicting holds fail fast with 409 instead of queueing '
+        'on row locks. Expired holds are released before placing a new one and when reading the seat map'
+    ),
+    'parameters': [
+        {'name': 'schedule_id', 'in': 'path', 'type': 'integer', 'required': True},
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'seat_ids': {'type': 'array', 'items': {'type': 'integer'}},
+                    'positions': {'type': 'array', 'items': {'type': 'integer'}},
+                    'ttl_seconds': {'type': 'integer', 'example': HOLD_TTL_SECONDS}
+                }
+            }
+        }
+    ],
+    'responses': {
+        201: {'description': 'Seats held, returns hold_id and expires_at'},
+        400: {'description': 'Bad request - Invalid seats or ttl'},
+        404: {'description': 'Schedule not found'},
+        409: {'description': 'Some seats are already held or sold'}
+    }
+})
+def create_seat_hold(schedule_id):
+    try:
+        room_id = schedule_room_id(schedule_id)
+        if room_id is None:
+            return jsonify({'success': False, 'error': 'Schedule not found'}), 404
+        
+        layout = room_layout(room_id)
+        data = request.get_json() or {}
+        positions = requested_positions(layout, data)
+        ttl = data.get('ttl_seconds', HOLD_TTL_SECONDS)
+        if not is_int(ttl) or not 0 < ttl <= HOLD_MAX_TTL_SECONDS:
+            return jsonify({'success': False, 'error': f'ttl_seconds must be an integer between 1 and {HOLD_MAX_TTL_SECONDS}'}), 400
+        
+        sweep_expired_holds(schedule_id, layout['size'])
+        hold = SeatHold(
+            id=uuid.uuid4().hex,
+            schedule_id=schedule_id,
+            positions=json.dumps(positions),
+            status='held',
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+        )
+        # La fila de la retención se confirma en la misma transacción que el bitmap
+        bitmap, version = update_seatmap(schedule_id, layout['size'], seatmap.set_bits, positions, claim=lambda: db.session.add(hold))
+        
+        payload = hold_payload(hold, layout)
+        payload['available'] = available_seats(layout, bitmap)
+        return jsonify({'success': True, 'data': payload}), 201
+    except InvalidSeats as e:
+        return invalid_seats_response(e)
+    except seatmap.SeatConflict as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Seats not available',
+            'details': [layout['seat_ids'][position] for position in e.positions]
+        }), 409
+    except SeatMapBusy:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Seat map is busy, retry'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/schedules/<int:schedule_id>/holds/<hold_id>', methods=['GET'])
+def get_seat_hold(schedule_id, hold_id):
+    try:
+        hold = schedule_hold(schedule_id, hold_id)
+        if hold is None:
+            return jsonify({'success': False, 'error': 'Hold not found'}), 404
+        layout = room_layout(schedule_room_id(schedule_id))
+        if hold.status == 'held' and hold.expires_at <= datetime.utcnow():
+            sweep_expired_holds(schedule_id, layout['size'])
+            hold = db.session.get(SeatHold, hold_id, populate_existing=True)
+        return jsonify({'success': True, 'data': hold_payload(hold, layout)})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/schedules/<int:schedule_id>/holds/<hold_id>/confirm', methods=['POST'])
+@swag_from({
+    'tags': ['Seats'],
+    'summary': 'Confirm a seat hold',
+    'description': 'Turns an active hold into a confirmed booking; the seats stay taken. Fails with 409 if the hold expired or was released',
+    'parameters': [
+        {'name': 'schedule_id', 'in': 'path', 'type': 'integer', 'required': True},
+        {'name': 'hold_id', 'in': 'path', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {'description': 'Hold confirmed'},
+        404: {'description': 'Hold not found'},
+        409: {'description': 'Hold is no longer active'}
+    }
+})
+def confirm_seat_hold(schedule_id, hold_id):
+    try:
+        hold = schedule_hold(schedule_id, hold_id)
+        if hold is None:
+            return jsonify({'success': False, 'error': 'Hold not found'}), 404
+        
+        # Solo confirma si sigue retenida y sin vencer; un barrido concurrente no puede colarse
+        result = db.session.execute(
+            db.update(SeatHold)
+            .where(SeatHold.id == hold_id, SeatHold.status == 'held', SeatHold.expires_at > datetime.utcnow())
+            .values(status='confirmed', updated_at=datetime.utcnow())
+        )
+        db.session.commit()
+        hold = db.session.get(SeatHold, hold_id, populate_existing=True)
+        layout = room_layout(schedule_room_id(schedule_id))
+        if result.rowcount != 1:
+            if hold.status == 'held':
+                sweep_expired_holds(schedule_id, layout['size'])
+                hold = db.session.get(SeatHold, hold_id, populate_existing=True)
+            status = hold.status
+            return jsonify({'success': False, 'error': f'Hold is {status}', 'data': hold_payload(hold, layout)}), 409
+        return jsonify({'success': True, 'data': hold_payload(hold, layout)})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/schedules/<int:schedule_id>/holds/<hold_id>/release', methods=['POST'])
+@swag_from({
+    'tags': ['Seats'],
+    'summary': 'Release a seat hold',
+    'description': 'Frees the seats of an active hold. Fails with 409 if the hold was already confirmed, released or expired',
+    'parameters': [
+        {'name': 'schedule_id', 'in': 'path', 'type': 'integer', 'required': True},
+        {'name': 'hold_id', 'in': 'path', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {'description': 'Hold released'},
+        404: {'description': 'Hold not found'},
+        409: {'description': 'Hold is no longer active'}
+    }
+})
+def release_seat_hold(schedule_id, hold_id):
+    try:
+        hold = schedule_hold(schedule_id, hold_id)
+        if hold is None:
+            return jsonify({'success': False, 'error': 'Hold not found'}), 404
+        
+        layout = room_layout(schedule_room_id(schedule_id))
+        bitmap, version = finish_hold(hold, layout['size'], 'released')
+        hold = db.session.get(SeatHold, hold_id, populate_existing=True)
+        payload = hold_payload(hold, layout)
+        payload['available'] = available_seats(layout, bitmap)
+        return jsonify({'success': True, 'data': payload})
+    except HoldNotActive as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except SeatMapBusy:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Seat map is busy, retry'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/holds/sweep', methods=['POST'])
+def sweep_seat_holds():
+    """Barrido global de retenciones vencidas (para un cron); los horarios también se barren al usarlos."""
+    try:
+        return jsonify({'success': True, 'data': {'expired': sweep_expired_holds()}})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({'success': True, 'data': catalog_cache.stats()})
+
+@bp.route('/api/pool/stats', methods=['GET'])
+def get_pool_stats():
+    data = pool_status(db.engine)
+    data['admission'] = admission.controller.stats()
+    if replica.BIND_KEY in db.engines:
+        data['replica'] = replica.monitor.stats()
+    return jsonify({'success': True, 'data': data})
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    extra = []
+    cache_stats = catalog_cache.stats()
+    for name in ('size', 'maxsize'):
+        extra.extend(metrics.sample(f'rooms_api_cache_{name}', f'Catalog cache {name}', cache_stats[name]))
+    for name in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+        extra.extend(metrics.sample(f'rooms_api_cache_{name}_total', f'Catalog cache {name}', cache_stats[name], 'counter'))
+    status = pool_status(db.engine)
+    for name in ('size', 'checked_out', 'overflow'):
+        if name in status:
+            extra.extend(metrics.sample(f'rooms_api_db_pool_{name}', f'Connection pool {name}', status[name]))
+    extra.extend(metrics.sample('rooms_api_db_pool_timeouts_total', 'Connection pool checkout timeouts', status['timeouts'], 'counter'))
+    extra.append('# HELP rooms_api_db_pool_wait_seconds Time waiting for a pooled connection')
+    extra.append('# TYPE rooms_api_db_pool_wait_seconds histogram')
+    for bound, count in status['wait_seconds_histogram'].items():
+        extra.append(f'rooms_api_db_pool_wait_seconds_bucket{{le="{bound}"}} {count}')
+    extra.append(f'rooms_api_db_pool_wait_seconds_sum {status["wait_seconds_sum"]}')
+    extra.append(f'rooms_api_db_pool_wait_seconds_count {status["checkouts"]}')
+    admission_stats = admission.controller.stats()
+    extra.append('# HELP rooms_api_admission_queue_depth Requests waiting for a database slot')
+    extra.append('# TYPE rooms_api_admission_queue_depth gauge')
+    for priority, count in sorted(admission_stats['waiting'].items()):
+        extra.append(f'rooms_api_admission_queue_depth{{priority="{priority}"}} {count}')
+    extra.append('# HELP rooms_api_admission_active Requests holding a database slot')
+    extra.append('# TYPE rooms_api_admission_active gauge')
+    for priority, count in sorted(admission_stats['active'].items()):
+        extra.append(f'rooms_api_admission_active{{priority="{priority}"}} {count}')
+    extra.append('# HELP rooms_api_admission_shed_total Requests rejected with 503')
+    extra.append('# TYPE rooms_api_admission_shed_total counter')
+    for (priority, reason), count in sorted(admission.controller.shed.items()):
+        extra.append(f'rooms_api_admission_shed_total{{priority="{priority}",reason="{reason}"}} {count}')
+    coalesce_stats = coalesce.stats.snapshot()
+    for name in ('executions', 'coalesced', 'timeouts'):
+        extra.extend(metrics.sample(f'rooms_api_coalesce_{name}_total', f'Identical concurrent reads: {name}', coalesce_stats[name], 'counter'))
+    extra.extend(metrics.sample('rooms_api_coalesce_in_flight', 'Reads being executed on behalf of waiting requests', coalesce_stats['in_flight']))
+    compression_stats = compression.stats.snapshot()
+    for name in compression.CompressionStats.FIELDS:
+        extra.append(f'# HELP rooms_api_compression_{name}_total Compressed responses {name.replace("_", " ")}')
+        extra.append(f'# TYPE rooms_api_compression_{name}_total counter')
+        for encoding, values in sorted(compression_stats.items()):
+            extra.append(f'rooms_api_compression_{name}_total{{encoding="{encoding}"}} {values[name]}')
+    if replica.BIND_KEY in db.engines:
+        replica_stats = replica.monitor.stats()
+        extra.extend(metrics.sample('rooms_api_db_replica_healthy', 'Whether reads may go to the replica', int(replica_stats['healthy'])))
+        if replica_stats['lag_seconds'] is not None:
+            extra.extend(metrics.sample('rooms_api_db_replica_lag_seconds', 'Last measured replica lag', replica_stats['lag_seconds']))
+        extra.append('# HELP rooms_api_db_reads_total Replica-eligible reads by route taken')
+        extra.append('# TYPE rooms_api_db_reads_total counter')
+        for route, count in sorted(replica_stats['routed'].items()):
+            extra.append(f'rooms_api_db_reads_total{{route="{route}"}} {count}')
+    return current_app.response_class(metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
 # Health check
-@app.route('/health', methods=['GET'])
+@bp.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'service': 'rooms-api'})
 
-if __name__ == '__main__':
+# Fábrica de la aplicación
+def database_uri():
+    return f"mysql+pymysql://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}@{os.getenv('MYSQL_HOST')}:{os.getenv('MYSQL_PORT')}/{os.getenv('MYSQL_DATABASE')}"
+
+def create_app(config=None):
+    """Crea y configura una instancia de la aplicación.
+
+    No abre conexiones: el engine se crea aquí pero el pool se llena bajo demanda, así que
+    la app puede construirse en el master de gunicorn (``preload_app``) y cada worker
+    descarta el pool heredado con ``dispose_engines`` tras el fork (ver gunicorn.conf.py).
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    CORS(app)
+    
+    # Configuración de la base de datos
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env()
+    replica_uri = replica.uri_from_env()
+    if replica_uri:
+        app.config['SQLALCHEMY_BINDS'] = {replica.BIND_KEY: replica_uri}
+    app.config.update(config or {})
+    
+    db.init_app(app)
+    metrics.init_app(app)
+    sqltrace.init_app(app)
+    replica.init_app(app, db)
+    compression.init_app(app)
+    admission.init_app(app)
+    app.register_blueprint(bp)
+    # /apispec_1.json desde static/openapi.json; flasgger solo se carga al abrir /docs
+    openapi.init_app(app, bp, swagger_config, swagger_template)
+    
+    return app
+
+def dispose_engines(app):
+    """Descarta las conexiones heredadas del proceso padre sin cerrarlas (seguro tras fork)."""
     with app.app_context():
-        db.create_all()
-    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 3002)), debug=os.getenv('FLASK_DEBUG', 'True').lower() == 'true')
\ No newline at end of file
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+if __name__ == '__main__':
+    from migrate import migrate
+    app = create_app()
+    # Crea las tablas que falten y añade a las existentes las columnas e índices nuevos
+    migrate(app, db)
+    warm_availability(app)
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 3002)), debug=os.getenv('FLASK_DEBUG', 'False').lower() == 'true')
\ No newline at end of file
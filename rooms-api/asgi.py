@@ -0,0 +1,20 @@
+"""Modo ASGI de rooms-api: ``uvicorn asgi:app``.
+
+La misma app Flask montada vía WSGI en un pool de ``ASGI_WSGI_THREADS`` hilos, para
+desplegar detrás de un servidor ASGI. Todas las rutas pasan por Flask, así que conservan el
+enrutado a la réplica, el control de admisión, la agrupación de lecturas, la compresión y
+las métricas. No hay handlers asíncronos propios: mientras no haya medidas contra MySQL que
+los justifiquen, un segundo camino de lectura solo duplicaría esas protecciones.
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import create_app
+
+# Hilos para las peticiones que atiende Flask
+WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 10))
+
+flask_app = create_app()
+
+app = WSGIMiddleware(flask_app, workers=WSGI_THREADS)
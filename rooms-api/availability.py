@@ -0,0 +1,127 @@
+"""Índice en memoria de ocupación de salas para consultas de disponibilidad.
+
+Cada sala guarda sus intervalos ocupados [inicio, fin) ordenados por inicio junto con la
+mayor duración vista. Un intervalo que solapa con [a, b) tiene que empezar en
+[a - duración máxima, b), así que una consulta es un par de ``bisect`` más los pocos
+intervalos de esa ventana, y altas y bajas son inserciones en listas ordenadas. El índice
+no sabe nada de la base de datos: ``app.py`` lo carga y lo mantiene al día, y también usa
+``RoomIntervals`` para comprobar solapes en el alta masiva de horarios.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from threading import RLock
+
+
+class RoomIntervals:
+    """Intervalos [inicio, fin) de una sala ordenados por inicio; ``key`` identifica cada uno
+    (el id del horario, o lo que necesite quien consulta los solapes)."""
+
+    def __init__(self):
+        self.starts = []
+        self.entries = []  # (inicio, fin, key) en el orden de starts
+        self.max_span = timedelta(0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, start, end):
+        index = bisect_right(self.starts, start)
+        self.entries.insert(index, (start, end, key))
+        self.starts.insert(index, start)
+        self.max_span = max(self.max_span, end - start)
+
+    def remove(self, key, start):
+        index = bisect_left(self.starts, start)
+        while index < len(self.entries) and self.entries[index][0] == start:
+            if self.entries[index][2] == key:
+                del self.entries[index]
+                del self.starts[index]
+                return
+            index += 1
+
+    def overlapping(self, start, end):
+        low = bisect_left(self.starts, start - self.max_span)
+        high = bisect_left(self.starts, end)
+        return [entry for entry in self.entries[low:high] if entry[1] > start]
+
+    def free_slots(self, start, end, min_length):
+        """Huecos libres dentro de [start, end) de al menos ``min_length``."""
+        slots, cursor = [], start
+        for busy_start, busy_end, _ in self.overlapping(start, end):
+            if busy_start - cursor >= min_length:
+                slots.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if end - cursor >= min_length:
+            slots.append((cursor, end))
+        return slots
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self.rooms = {}        # room_id -> dict con name, capacity, screen_type, is_active
+        self.timelines = {}    # room_id -> RoomIntervals
+        self.schedules = {}    # schedule_id -> (room_id, inicio) para poder moverlos o quitarlos
+        self.lock = RLock()
+        self.loaded = False
+
+    def clear(self):
+        with self.lock:
+            self.rooms.clear()
+            self.timelines.clear()
+            self.schedules.clear()
+            self.loaded = False
+
+    def upsert_room(self, room_id, **attributes):
+        with self.lock:
+            self.rooms[room_id] = attributes
+
+    def replace(self, rooms, schedules):
+        """Sustituye todo el contenido; el índice nuevo se construye fuera del cerrojo.
+
+        ``rooms`` son pares (room_id, atributos) y ``schedules`` tuplas (schedule_id, room_id, inicio, fin)
+        de horarios activos.
+        """
+        timelines, by_id = {}, {}
+        for schedule_id, room_id, start, end in schedules:
+            timelines.setdefault(room_id, RoomIntervals()).add(schedule_id, start, end)
+            by_id[schedule_id] = (room_id, start)
+        rooms = dict(rooms)
+        with self.lock:
+            self.rooms, self.timelines, self.schedules = rooms, timelines, by_id
+            self.loaded = True
+
+    def upsert_schedule(self, schedule_id, room_id, start, end, is_active):
+        """Alta, cambio o baja (``is_active`` falso) de un horario; idempotente."""
+        with self.lock:
+            previous = self.schedules.pop(schedule_id, None)
+            if previous is not None:
+                self.timelines[previous[0]].remove(schedule_id, previous[1])
+            if is_active:
+                self.timelines.setdefault(room_id, RoomIntervals()).add(schedule_id, start, end)
+                self.schedules[schedule_id] = (room_id, start)
+
+    def search(self, start, end, screen_type=None, min_capacity=None, min_length=None):
+        """Salas activas con algún hueco libre de ``min_length`` (por defecto, toda la ventana)."""
+        min_length = min_length if min_length is not None else end - start
+        results = []
+        with self.lock:
+            for room_id, room in sorted(self.rooms.items()):
+                if not room['is_active']:
+                    continue
+                if screen_type is not None and room['screen_type'] != screen_type:
+                    continue
+                if min_capacity is not None and room['capacity'] < min_capacity:
+                    continue
+                timeline = self.timelines.get(room_id)
+                slots = timeline.free_slots(start, end, min_length) if timeline else [(start, end)]
+                if slots:
+                    results.append((room_id, room, slots))
+        return results
+
+    def stats(self):
+        with self.lock:
+            return {
+                'loaded': self.loaded,
+                'rooms': len(self.rooms),
+                'intervals': sum(len(timeline) for timeline in self.timelines.values())
+            }
@@ -0,0 +1,50 @@
+"""Tiempo de arranque en frío: import de ``wsgi`` (incluye ``create_app``) hasta la primera respuesta.
+
+Cada medición es un proceso nuevo. No abre conexiones a MySQL (``/health`` y la
+especificación no consultan la base de datos), así que basta con variables MYSQL_* ficticias.
+
+Uso: python benchmarks/bench_cold_start.py [--runs 10] [--root DIR] [ruta ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from wsgi import app
+imported = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({'status': response.status_code, 'import': imported - started, 'request': finished - imported}))
+'''
+
+
+def measure(root, path):
+    env = {'MYSQL_USER': 'bench', 'MYSQL_PASSWORD': 'bench', 'MYSQL_HOST': 'localhost', 'MYSQL_PORT': '3306',
+           'MYSQL_DATABASE': 'bench', **os.environ}
+    output = subprocess.run([sys.executable, '-c', PROBE, path], cwd=root, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('paths', nargs='*', default=['/health', '/apispec_1.json'])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--root', default=os.path.join(os.path.dirname(__file__), '..'))
+    args = parser.parse_args()
+
+    print(f"{'path':<18} {'status':>6} {'import ms':>10} {'1st req ms':>11} {'total ms':>9}")
+    for path in args.paths:
+        samples = [measure(args.root, path) for _ in range(args.runs)]
+        imported = statistics.median(sample['import'] for sample in samples) * 1000
+        request = statistics.median(sample['request'] for sample in samples) * 1000
+        print(f"{path:<18} {samples[0]['status']:>6} {imported:>10.1f} {request:>11.1f} {imported + request:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
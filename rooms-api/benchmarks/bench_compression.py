@@ -0,0 +1,70 @@
+"""Bytes en el cable y CPU de compresión para páginas típicas de horarios y asientos.
+
+Para cada tamaño de página compara el JSON sin comprimir con gzip y brotli a los niveles
+configurados (``COMPRESS_GZIP_LEVEL``, ``COMPRESS_BROTLI_QUALITY``) y mide el coste de
+comprimir frente al de servir los bytes ya comprimidos desde la caché.
+
+Uso: python benchmarks/bench_compression.py [filas ...]
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import compression
+from serializers import SCHEDULE_LIST_FIELDS, SEAT_FIELDS, dumps, serialize_schedule, serialize_seat
+
+ScheduleRow = namedtuple('ScheduleRow', SCHEDULE_LIST_FIELDS)
+SeatRow = namedtuple('SeatRow', SEAT_FIELDS)
+
+
+def schedules_page(count):
+    start = datetime(2024, 1, 1, 10, 0)
+    rows = [
+        ScheduleRow(i, f'507f1f77bcf86cd799{i % 900000 + 100000}', i % 12 + 1,
+                    start + timedelta(minutes=15 * i), Decimal('12.50'), True, f'Sala {i % 12 + 1}')
+        for i in range(count)
+    ]
+    return dumps({'success': True, 'data': [serialize_schedule(row, SCHEDULE_LIST_FIELDS) for row in rows]})
+
+
+def seats_page(count):
+    rows = [SeatRow(i + 1, 1, chr(65 + i // 20), i % 20 + 1, 'standard', i % 7 != 0) for i in range(count)]
+    return dumps({'success': True, 'data': [serialize_seat(row) for row in rows]})
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [20, 100, 500, 1000]
+    encodings = [encoding for encoding in ('gzip', 'br') if encoding in compression.ENCODINGS]
+    header = f"{'payload':<16} {'identity':>9}"
+    for encoding in encodings:
+        header += f" {encoding + ' bytes':>11} {'ratio':>6} {'µs':>7}"
+    print(header + f" {'cache hit µs':>13}")
+    for name, build in (('schedules', schedules_page), ('seats', seats_page)):
+        for size in sizes:
+            body = build(size)
+            line = f'{name + " x" + str(size):<16} {len(body):>9,}'
+            for encoding in encodings:
+                data = compression.compress(body, encoding)
+                seconds = best_of(lambda: compression.compress(body, encoding), 20)
+                line += f' {len(data):>11,} {len(body) / len(data):>5.1f}x {seconds * 1e6:>7.0f}'
+            compression.encode(body, 'gzip', etag=('bench', name, size))
+            hit = best_of(lambda: compression.cached_body(('bench', name, size), 'gzip'), 20)
+            print(line + f' {hit * 1e6:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Throughput con peticiones concurrentes contra uno o varios servidores de rooms-api (p. ej. gunicorn y uvicorn).
+
+Arranca cada servidor contra la misma base de datos y lanza la carga contra todos, p. ej.:
+
+    gunicorn -c gunicorn.conf.py wsgi:app                      # PORT=3002
+    uvicorn asgi:app --port 3003 --workers 4
+    python benchmarks/bench_concurrency.py --path '/api/schedules?limit=50' \\
+        http://localhost:3002 http://localhost:3003
+
+Cada cliente es un hilo con una conexión keep-alive de ``http.client``, que lee el cuerpo
+completo tanto con ``Content-Length`` como con ``Transfer-Encoding: chunked`` (NDJSON con
+``--header 'Accept: application/x-ndjson'`` o ``?stream=true``). Con cientos de clientes el
+propio generador puede quedarse sin CPU: conviene lanzarlo en otra máquina o comprobar que
+no satura un núcleo.
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def client(host, port, path, headers, deadline, latencies, errors, lock):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - started
+            with lock:
+                if response.status == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(response.status)
+    except (OSError, http.client.HTTPException) as e:
+        with lock:
+            errors.append(type(e).__name__)
+    finally:
+        connection.close()
+
+
+def run(base_url, path, headers, concurrency, duration):
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client, args=(host, port, path, headers, deadline, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    return statistics.quantiles(values, n=100)[int(fraction * 100) - 1] if len(values) > 1 else (values or [0])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('urls', nargs='+', help='base URL of each server to compare')
+    parser.add_argument('--path', default='/api/schedules?limit=50')
+    parser.add_argument('--header', action='append', default=[], help="extra request header, e.g. 'Accept: application/x-ndjson'")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 300])
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per run')
+    args = parser.parse_args()
+    headers = dict(header.split(':', 1) for header in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+
+    print(f"{'server':<28} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for concurrency in args.concurrency:
+        for base_url in args.urls:
+            latencies, errors, elapsed = run(base_url, args.path, headers, concurrency, args.duration)
+            print(
+                f'{base_url:<28} {concurrency:>5} {len(latencies) / elapsed:>9,.0f} '
+                f'{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} {len(errors):>7}'
+            )
+
+
+if __name__ == '__main__':
+    main()
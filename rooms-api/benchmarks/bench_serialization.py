@@ -0,0 +1,76 @@
+"""Microbenchmark de serialización de horarios: dicts a mano + json de Flask vs serializers + orjson.
+
+Uso: python benchmarks/bench_serialization.py [filas ...]
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from serializers import FastJSONProvider, serialize_schedule, SCHEDULE_LIST_FIELDS
+
+Row = namedtuple('Row', SCHEDULE_LIST_FIELDS)
+
+
+def make_rows(count):
+    start = datetime(2024, 1, 1, 10, 0)
+    return [
+        Row(i, f'507f1f77bcf86cd799{i % 900000 + 100000}', i % 100 + 1,
+            start + timedelta(minutes=15 * i), Decimal('12.50'), True, f'Sala {i % 100 + 1}')
+        for i in range(count)
+    ]
+
+
+def legacy(rows, provider):
+    return provider.dumps({
+        'success': True,
+        'data': [{
+            'id': row.id,
+            'movie_id': row.movie_id,
+            'room_id': row.room_id,
+            'show_time': row.show_time.isoformat(),
+            'price': float(row.price),
+            'is_active': row.is_active,
+            'room_name': row.room_name
+        } for row in rows]
+    })
+
+
+def fast(rows, provider):
+    return provider.dumps({
+        'success': True,
+        'data': [serialize_schedule(row, SCHEDULE_LIST_FIELDS) for row in rows]
+    })
+
+
+def measure(func, rows, provider, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows, provider)
+        best = min(best, time.perf_counter() - started)
+    return len(rows) / best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000]
+    app = Flask(__name__)
+    default_provider, fast_provider = DefaultJSONProvider(app), FastJSONProvider(app)
+    print(f"{'rows':>8} {'before rows/s':>15} {'after rows/s':>15} {'speedup':>8}")
+    for size in sizes:
+        rows = make_rows(size)
+        repeat = 20 if size <= 10_000 else 3
+        before = measure(legacy, rows, default_provider, repeat)
+        after = measure(fast, rows, fast_provider, repeat)
+        print(f'{size:>8} {before:>15,.0f} {after:>15,.0f} {after / before:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Prueba de estrés de retenciones de asientos: muchos clientes compiten por los mismos asientos.
+
+Antes de la carga se reproduce una secuencia fija sobre un asiento libre: una retención
+vence, el asiento se vuelve a retener, el barrido expira la primera y una tercera retención
+debe seguir fallando (el barrido no puede liberar bits de la segunda).
+
+Después cada cliente retiene un bloque aleatorio de asientos de una zona pequeña (para forzar
+conflictos) y lo confirma, lo libera o lo deja expirar. Al final comprueba que:
+
+- ningún asiento quedó confirmado en dos retenciones (doble venta), y
+- tras expirar todo, el mapa del horario contiene exactamente los asientos confirmados.
+
+Uso (contra un servidor levantado y un horario con asientos):
+    python benchmarks/stress_holds.py http://localhost:3002 --schedule 1 --clients 50 --duration 20
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def call(base_url, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'{}')
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.confirmed = []  # posiciones de cada retención confirmada
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+def client(args, hot_positions, deadline, stats):
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        block = rng.randint(1, 4)
+        start = rng.randrange(0, len(hot_positions) - block + 1)
+        positions = hot_positions[start:start + block]
+        status, body = call(args.url, 'POST', f'/api/schedules/{args.schedule}/holds',
+                            {'positions': positions, 'ttl_seconds': args.ttl})
+        if status != 201:
+            stats.count('hold_conflict' if status == 409 else f'hold_{status}')
+            continue
+        stats.count('hold_ok')
+        hold_id = body['data']['hold_id']
+        action = rng.random()
+        if action < 0.3:
+            status, _ = call(args.url, 'POST', f'/api/schedules/{args.schedule}/holds/{hold_id}/confirm')
+            stats.count(f'confirm_{status}')
+            if status == 200:
+                with stats.lock:
+                    stats.confirmed.append(positions)
+        elif action < 0.7:
+            status, _ = call(args.url, 'POST', f'/api/schedules/{args.schedule}/holds/{hold_id}/release')
+            stats.count(f'release_{status}')
+        else:
+            stats.count('left_to_expire')
+
+
+def check_expiry_interleaving(args, position):
+    """Retener A (TTL 1 s) → B choca → A vence → B retiene → barrido → C choca → B confirma."""
+    path = f'/api/schedules/{args.schedule}/holds'
+    expected = []
+    status, body = call(args.url, 'POST', path, {'positions': [position], 'ttl_seconds': 1})
+    expected.append(('hold A', status, 201))
+    status, _ = call(args.url, 'POST', path, {'positions': [position]})
+    expected.append(('hold B while A is active', status, 409))
+    time.sleep(1.5)
+    status, body = call(args.url, 'POST', path, {'positions': [position]})
+    expected.append(('hold B after A expired', status, 201))
+    hold_b = body.get('data', {}).get('hold_id')
+    call(args.url, 'POST', '/api/holds/sweep')
+    status, body = call(args.url, 'POST', path, {'positions': [position]})
+    expected.append(('hold C after the sweep', status, 409))
+    hold_c = body.get('data', {}).get('hold_id') if status == 201 else None
+    status, _ = call(args.url, 'POST', f'{path}/{hold_b}/confirm')
+    expected.append(('confirm B', status, 200))
+    if hold_c is not None:
+        status, _ = call(args.url, 'POST', f'{path}/{hold_c}/confirm')
+        expected.append(('confirm C', status, 409))
+    failures = [(step, status, wanted) for step, status, wanted in expected if status != wanted]
+    for step, status, wanted in expected:
+        print(f'  {step:<28} {status} (expected {wanted})')
+    return failures
+
+
+def held_positions(bitmap_b64, size):
+    bitmap = base64.b64decode(bitmap_b64)
+    return {position for position in range(size) if bitmap[position >> 3] & (1 << (position & 7))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('url')
+    parser.add_argument('--schedule', type=int, default=1)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--ttl', type=int, default=2)
+    parser.add_argument('--hot-seats', type=int, default=40, help='size of the contended zone')
+    args = parser.parse_args()
+
+    status, body = call(args.url, 'GET', f'/api/schedules/{args.schedule}/seatmap')
+    if status != 200:
+        raise SystemExit(f'Cannot read seat map: {status} {body}')
+    size = body['data']['size']
+    free = [position for position in range(size) if position not in held_positions(body['data']['bitmap'], size)]
+    if not free:
+        raise SystemExit('No free seats left in this schedule')
+    print(f'expiry interleaving on position {free[0]}:')
+    interleaving_failures = check_expiry_interleaving(args, free[0])
+
+    _, body = call(args.url, 'GET', f'/api/schedules/{args.schedule}/seatmap')
+    already_held = held_positions(body['data']['bitmap'], size)
+    hot_positions = [position for position in range(size) if position not in already_held][:args.hot_seats]
+
+    stats = Stats()
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=client, args=(args, hot_positions, deadline, stats)) for _ in range(args.clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    # Esperar a que venzan las retenciones abandonadas y barrerlas
+    time.sleep(args.ttl + 1)
+    call(args.url, 'POST', '/api/holds/sweep')
+    _, body = call(args.url, 'GET', f'/api/schedules/{args.schedule}/seatmap')
+    final = held_positions(body['data']['bitmap'], size) - already_held
+
+    confirmed = [position for positions in stats.confirmed for position in positions]
+    double_booked = sorted({position for position in confirmed if confirmed.count(position) > 1})
+    operations = sum(stats.counts.values())
+    print(f'{operations} operations in {elapsed:.1f}s ({operations / elapsed:,.0f}/s) with {args.clients} clients')
+    for name, value in sorted(stats.counts.items()):
+        print(f'  {name:<16} {value}')
+    print(f'confirmed seats: {len(confirmed)}, double booked: {double_booked or "none"}')
+    print(f'seat map matches confirmed seats: {final == set(confirmed)}')
+    print(f'expiry interleaving: {"ok" if not interleaving_failures else interleaving_failures}')
+    if interleaving_failures or double_booked or final != set(confirmed):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Agrupación (single-flight) de lecturas idénticas concurrentes dentro de un proceso.
+
+Cuando llegan a la vez varias peticiones GET iguales (misma ruta y mismos parámetros
+normalizados), solo la primera ejecuta la vista; las demás esperan y reciben una copia de
+su respuesta, así que comparten la consulta a la base de datos y la serialización. Además
+de la ruta, la clave incluye las cabeceras que cambian la respuesta (``Accept``,
+``Accept-Encoding``, ``If-None-Match`` y la marca de escritura reciente de la réplica). Los
+hooks ``after_request`` (métricas, compresión, cookies) se siguen ejecutando por petición.
+"""
+from functools import wraps
+from threading import Event, Lock
+import os
+
+from flask import current_app, request
+
+import admission
+import compression
+from replica import WRITE_COOKIE, WRITE_HEADER
+
+COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', 'true').lower() == 'true'
+# Tiempo máximo que una petición espera a la que ya está en curso antes de ejecutarse por su cuenta
+COALESCE_WAIT_SECONDS = float(os.getenv('COALESCE_WAIT_SECONDS', 10))
+
+
+class CoalesceStats:
+    def __init__(self):
+        self.executions = 0   # peticiones que ejecutaron la vista
+        self.coalesced = 0    # peticiones servidas con el resultado de otra
+        self.timeouts = 0     # esperas agotadas que acabaron ejecutando la vista
+        self.in_flight = 0    # claves con una ejecución en curso
+        self._lock = Lock()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+                'in_flight': self.in_flight
+            }
+
+
+stats = CoalesceStats()
+
+
+def request_key(path, query_items, headers):
+    """Clave de agrupación: ruta, parámetros ordenados y cabeceras que cambian la respuesta."""
+    return (
+        path,
+        tuple(sorted(query_items)),
+        headers.get('Accept'),
+        compression.choose_encoding(headers.get('Accept-Encoding')),
+        headers.get('If-None-Match'),
+        headers.get(WRITE_HEADER),
+        headers.get('Cookie') if WRITE_COOKIE in headers.get('Cookie', '') else None
+    )
+
+
+def wants_stream(args, headers):
+    """Las respuestas NDJSON se generan al enviarse y no se pueden compartir."""
+    return args.get('stream', '').lower() in ('1', 'true') or 'application/x-ndjson' in headers.get('Accept', '')
+
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = Lock()
+
+    def do(self, key, func, timeout=COALESCE_WAIT_SECONDS):
+        """Ejecuta ``func`` una vez por clave en curso; devuelve ``(resultado, compartido)``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if not call.done.wait(timeout):
+                stats.count('timeouts')
+                return func(), False
+            stats.count('coalesced')
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        stats.count('executions')
+        stats.count('in_flight')
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            stats.count('in_flight', -1)
+            call.done.set()
+
+
+flights = SingleFlight()
+
+
+def _snapshot(response):
+    """Copia reutilizable (cuerpo, estado, cabeceras) o None si la respuesta es un stream."""
+    if response.is_streamed or response.direct_passthrough:
+        return None
+    return response.get_data(), response.status_code, list(response.headers)
+
+
+def coalesced(view):
+    """Agrupa las ejecuciones concurrentes de una vista de lectura con la misma clave."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not COALESCE_ENABLED or request.method != 'GET' or wants_stream(request.args, request.headers):
+            return view(*args, **kwargs)
+
+        def run():
+            response = current_app.make_response(view(*args, **kwargs))
+            # Si el control de admisión descartó esta petición, las que esperan lo intentan por su cuenta
+            return response, None if admission.was_shed() else _snapshot(response)
+
+        key = request_key(request.path, request.args.items(multi=True), request.headers)
+        (response, snapshot), shared = flights.do(key, run)
+        if not shared:
+            return response
+        if snapshot is None:
+            return view(*args, **kwargs)
+        body, status, headers = snapshot
+        return current_app.response_class(body, status=status, headers=headers)
+    return wrapper
@@ -0,0 +1,129 @@
+"""Compresión gzip/brotli de respuestas a partir de un tamaño mínimo.
+
+La codificación se negocia con ``Accept-Encoding``: brotli si el paquete ``brotli`` está
+instalado y el cliente lo acepta, si no gzip. Los bytes comprimidos de las respuestas con
+ETag se guardan en una caché LRU indexada por (ETag, codificación); como el ETag identifica
+la versión del contenido, un listado popular se comprime una vez por versión y los aciertos
+se sirven sin volver a serializar ni comprimir. Al comprimir, el ETag pasa a débil (igual
+que hace nginx) porque los bytes ya no son los de la representación sin comprimir, y los
+GET condicionales usan comparación débil.
+"""
+from threading import Lock
+import gzip
+import os
+import time
+
+from flask import current_app, request
+from werkzeug.http import parse_accept_header
+
+from cache import MISSING, TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+COMPRESSIBLE_TYPES = ('application/json', 'text/plain')
+# En empate de calidad gana la primera: brotli comprime más a igual coste de CPU
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+compressed_cache = TTLCache(
+    maxsize=int(os.getenv('COMPRESS_CACHE_SIZE', 512)),
+    default_ttl=int(os.getenv('COMPRESS_CACHE_TTL', 600))
+)
+
+
+class CompressionStats:
+    FIELDS = ('responses', 'cache_hits', 'bytes_in', 'bytes_out', 'seconds')
+
+    def __init__(self):
+        self._values = {}
+        self._lock = Lock()
+
+    def record(self, encoding, **amounts):
+        with self._lock:
+            values = self._values.setdefault(encoding, dict.fromkeys(self.FIELDS, 0))
+            for name, amount in amounts.items():
+                values[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return {encoding: dict(values) for encoding, values in self._values.items()}
+
+
+stats = CompressionStats()
+
+
+def choose_encoding(accept_encoding):
+    """Codificación preferida por el cliente entre las disponibles, o None."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(ENCODINGS)
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def cached_body(etag, encoding):
+    data = compressed_cache.get((etag, encoding))
+    if data is MISSING:
+        return None
+    stats.record(encoding, responses=1, cache_hits=1, bytes_out=len(data))
+    return data
+
+
+def encode(body, encoding, etag=None):
+    """Comprime ``body``; con ``etag`` el resultado queda disponible para ``cached_body``."""
+    started = time.perf_counter()
+    data = compress(body, encoding)
+    stats.record(encoding, responses=1, bytes_in=len(body), bytes_out=len(data), seconds=time.perf_counter() - started)
+    if etag is not None:
+        compressed_cache.set((etag, encoding), data)
+    return data
+
+
+def cached_response(etag):
+    """Respuesta Flask con los bytes comprimidos de ``etag`` si ya están en caché, o None."""
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    data = cached_body(etag, encoding) if encoding is not None else None
+    if data is None:
+        return None
+    response = current_app.response_class(data, mimetype='application/json')
+    response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag, weak=True)
+    return response
+
+
+def _compress_response(response):
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype not in COMPRESSIBLE_TYPES
+    ):
+        return response
+    response.vary.add('Accept-Encoding')
+    if response.content_encoding:
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_SIZE:
+        return response
+    etag, weak = response.get_etag()
+    response.set_data(encode(body, encoding, etag if etag and not weak else None))
+    response.content_encoding = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Registra la compresión; debe ir después de ``metrics.init_app`` para medir los bytes enviados."""
+    app.after_request(_compress_response)
@@ -0,0 +1,53 @@
+"""Configuración de gunicorn para producción.
+
+Con ``preload_app`` la app se construye una vez en el master y los workers la heredan por
+fork; ``post_fork`` descarta el pool de conexiones heredado para que ningún worker
+comparta sockets de MySQL con otro proceso.
+
+Cada worker abre su propio pool: salvo que se fijen ``DB_POOL_SIZE`` y ``DB_MAX_OVERFLOW``,
+el pool por worker se calcula para que ``workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` no
+supere ``DB_MAX_CONNECTIONS`` (ver pool.py).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 3002)}"
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# La app se carga después de leer este fichero: pool.py reparte las conexiones entre estos workers
+os.environ['GUNICORN_WORKERS'] = str(workers)
+worker_class = 'gthread'
+# Más hilos que ADMISSION_MAX_CONCURRENT + ADMISSION_MAX_QUEUE, para que /health y la caché no esperen.
+# admission.py se importa tras exportar GUNICORN_WORKERS porque sus límites salen del pool de cada worker
+from admission import MAX_CONCURRENT, MAX_QUEUE  # noqa: E402
+threads = int(os.getenv('GUNICORN_THREADS', MAX_CONCURRENT + MAX_QUEUE + 2))
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Reciclar workers de forma escalonada acota el crecimiento de memoria
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    from app import dispose_engines, warm_availability
+    app = worker.app.wsgi()
+    dispose_engines(app)
+    warm_availability(app)
+
+
+def when_ready(server):
+    from pool import DB_MAX_CONNECTIONS, engine_options_from_env
+    options = engine_options_from_env()
+    total = server.cfg.workers * (options['pool_size'] + options['max_overflow'])
+    if total > DB_MAX_CONNECTIONS:
+        server.log.warning(
+            'Up to %d database connections (%d workers x (%d + %d)) exceeds DB_MAX_CONNECTIONS=%d',
+            total, server.cfg.workers, options['pool_size'], options['max_overflow'], DB_MAX_CONNECTIONS
+        )
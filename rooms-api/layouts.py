@@ -0,0 +1,60 @@
+"""Plantillas de distribución de asientos reutilizables.
+
+Una plantilla define los asientos por fila y las bandas de tipo de asiento desde la
+pantalla hacia atrás; las filas que no cubre ninguna banda son ``regular``. La
+plantilla ``cinema`` reproduce la distribución de ``mysql-schema.sql`` (filas A-B VIP,
+C-E premium).
+"""
+from functools import lru_cache
+
+SEAT_LAYOUT_TEMPLATES = {
+    'standard': {
+        'description': 'All seats regular',
+        'seats_per_row': 10,
+        'bands': ()
+    },
+    'cinema': {
+        'description': 'Rows A-B VIP, rows C-E premium, the rest regular',
+        'seats_per_row': 10,
+        'bands': (('vip', 2), ('premium', 3))
+    },
+    'premium': {
+        'description': 'Rows A-C VIP, the rest premium',
+        'seats_per_row': 8,
+        'bands': (('vip', 3),),
+        'default_type': 'premium'
+    }
+}
+
+
+def row_label(index):
+    """Etiqueta de fila para un índice desde 1: A, B, ..., Z, AA, AB..."""
+    label = ''
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+
+@lru_cache(maxsize=256)
+def build_layout(template_name, rows, seats_per_row=None):
+    """Tupla de (row_number, seat_number, seat_type) para ``rows`` filas.
+
+    Se calcula una sola vez por combinación y se reutiliza para cualquier sala.
+    Lanza ``KeyError`` si la plantilla no existe.
+    """
+    template = SEAT_LAYOUT_TEMPLATES[template_name]
+    seats_per_row = seats_per_row or template['seats_per_row']
+    row_types = [seat_type for seat_type, band_rows in template['bands'] for _ in range(band_rows)]
+    default_type = template.get('default_type', 'regular')
+
+    return tuple(
+        (row_label(row), seat_number, row_types[row - 1] if row <= len(row_types) else default_type)
+        for row in range(1, rows + 1)
+        for seat_number in range(1, seats_per_row + 1)
+    )
+
+
+def rows_for_capacity(capacity, seats_per_row):
+    """Filas completas que caben en la capacidad de la sala."""
+    return capacity // seats_per_row
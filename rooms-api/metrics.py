@@ -0,0 +1,150 @@
+"""Métricas por ruta en formato de exposición de texto de Prometheus.
+
+Sin dependencias externas: contadores e histogramas acumulados en memoria por proceso,
+alimentados por hooks de Flask (latencia, estado, tamaño de respuesta) y por los eventos
+``before/after_cursor_execute`` de SQLAlchemy (consultas y tiempo de BD por petición).
+Cada observación es un ``bisect`` y una suma bajo un lock, así que puede quedar activo
+en producción.
+"""
+from bisect import bisect_left
+from threading import Lock
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = ','.join(f'{name}="{str(value)}"' for name, value in zip(labelnames, values))
+    return '{' + pairs + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [cuentas por bucket (+Inf al final), suma]
+        self._lock = Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        names = self.labelnames + ('le',)
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}')
+                lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total}')
+                lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+def sample(name, documentation, value, kind='gauge'):
+    """Una serie suelta (p. ej. contadores de la caché o del pool) en formato de exposición."""
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}', f'{name} {value}']
+
+
+REQUEST_LABELS = ('method', 'endpoint', 'status')
+
+requests_total = Counter('rooms_api_requests_total', 'HTTP requests handled', REQUEST_LABELS)
+request_duration = Histogram('rooms_api_request_duration_seconds', 'HTTP request latency', REQUEST_LABELS, LATENCY_BUCKETS)
+response_size = Histogram('rooms_api_response_size_bytes', 'HTTP response body size', REQUEST_LABELS, SIZE_BUCKETS)
+db_queries = Histogram('rooms_api_db_queries_per_request', 'SQL statements executed per request', REQUEST_LABELS, QUERY_COUNT_BUCKETS)
+db_duration = Histogram('rooms_api_db_duration_seconds', 'Time spent in SQL statements per request', REQUEST_LABELS, LATENCY_BUCKETS)
+
+REQUEST_METRICS = (requests_total, request_duration, response_size, db_queries, db_duration)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    if has_request_context() and 'db_queries' in g:
+        g.db_queries += 1
+        g.db_time += elapsed
+
+
+def _handle_error(context):
+    # Una sentencia fallida no dispara after_cursor_execute: se descarta su marca de inicio
+    if context.connection is not None and context.connection.info.get('query_start'):
+        context.connection.info['query_start'].pop()
+
+
+def _before_request():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_time = 0.0
+
+
+def _after_request(response):
+    if 'request_started' not in g:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    labels = (request.method, endpoint, str(response.status_code))
+    requests_total.inc(labels)
+    request_duration.observe(labels, time.perf_counter() - g.request_started)
+    db_queries.observe(labels, g.db_queries)
+    db_duration.observe(labels, g.db_time)
+    # Las respuestas en streaming no tienen longitud conocida
+    if not response.is_streamed:
+        response_size.observe(labels, response.calculate_content_length() or 0)
+    return response
+
+
+def init_app(app):
+    """Registra los hooks de petición y los eventos de SQLAlchemy (para todos los engines)."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+
+def render(extra_lines=()):
+    lines = []
+    for metric in REQUEST_METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return '\n'.join(lines) + '\n'
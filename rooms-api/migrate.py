@@ -0,0 +1,106 @@
+"""Migración idempotente de bases de datos creadas con un esquema anterior.
+
+``db.create_all()`` crea las tablas que faltan (``schedule_seatmaps``, ``seat_holds``) pero
+no añade columnas ni índices a las que ya existen, así que una base creada con una versión
+anterior de ``mysql-schema.sql`` o con ``data-generators/mysql-data-generator.py`` falla con
+"Unknown column" en cuanto se consulta ``Schedule``. Este script compara el esquema real con
+el que esperan los modelos (inspector de SQLAlchemy) y ejecuta solo los pasos pendientes, por
+lo que puede lanzarse en cada despliegue:
+
+    python migrate.py            # aplica los cambios
+    python migrate.py --dry-run  # solo muestra las sentencias
+"""
+import argparse
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+# (tabla, columna, definición MySQL) en el orden en que se añadieron
+COLUMNS = (
+    ('rooms', 'updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'),
+    ('schedules', 'duration_minutes', 'INT NOT NULL DEFAULT 120'),
+    ('schedules', 'updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP'),
+)
+
+# (tabla, índice, columnas)
+INDEXES = (
+    ('schedules', 'idx_schedules_movie_active_time', ('movie_id', 'is_active', 'show_time')),
+    ('rooms', 'idx_rooms_updated', ('updated_at',)),
+    ('schedules', 'idx_schedules_updated', ('updated_at',)),
+)
+
+# Posición fija de cada asiento en los mapas por horario. Las filas existentes reciben su índice
+# en el orden (fila, número), que es el que usaban hasta ahora los bitmaps guardados, así que
+# los mapas y retenciones existentes siguen apuntando a los mismos asientos.
+SEAT_POSITION_BACKFILL = (
+    'UPDATE seats JOIN ('
+    'SELECT id, ROW_NUMBER() OVER (PARTITION BY room_id ORDER BY `row_number`, seat_number) - 1 AS position '
+    'FROM seats) numbered ON numbered.id = seats.id '
+    'SET seats.position = numbered.position WHERE seats.position IS NULL'
+)
+
+# Índices que otro índice compuesto hace redundantes (es su prefijo)
+OBSOLETE_INDEXES = (
+    ('schedules', 'idx_schedules_movie'),
+)
+
+
+def pending_statements(inspector, metadata, dialect):
+    """Sentencias necesarias para llevar la base al esquema actual: tablas nuevas, columnas e índices."""
+    tables = set(inspector.get_table_names())
+    statements = []
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            statements.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+            statements.extend(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes)
+    columns = {table: {column['name']: column for column in inspector.get_columns(table)} for table in tables}
+    for table, column, definition in COLUMNS:
+        if table in tables and column not in columns[table]:
+            statements.append(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    existing = {table: {index['name'] for index in inspector.get_indexes(table)} for table in tables}
+    if 'seats' in tables:
+        position = columns['seats'].get('position')
+        if position is None:
+            statements.append('ALTER TABLE seats ADD COLUMN position INT NULL')
+        if position is None or position['nullable']:
+            statements.append(SEAT_POSITION_BACKFILL)
+            statements.append('ALTER TABLE seats MODIFY position INT NOT NULL')
+        unique = existing['seats'] | {constraint['name'] for constraint in inspector.get_unique_constraints('seats')}
+        if 'unique_seat_position' not in unique:
+            statements.append('ALTER TABLE seats ADD UNIQUE KEY unique_seat_position (room_id, position)')
+    for table, name, index_columns in INDEXES:
+        if table in tables and name not in existing[table]:
+            statements.append(f'CREATE INDEX {name} ON {table} ({", ".join(index_columns)})')
+    for table, name in OBSOLETE_INDEXES:
+        if name in existing.get(table, ()):
+            statements.append(f'DROP INDEX {name} ON {table}')
+    return statements
+
+
+def migrate(app, db, dry_run=False):
+    """Aplica (salvo ``dry_run``) los pasos pendientes y devuelve sus sentencias."""
+    with app.app_context():
+        statements = pending_statements(inspect(db.engine), db.metadata, db.engine.dialect)
+        if not dry_run:
+            with db.engine.begin() as connection:
+                for statement in statements:
+                    connection.execute(text(statement))
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bring an existing rooms database up to the current schema')
+    parser.add_argument('--dry-run', action='store_true', help='print the pending statements without running them')
+    args = parser.parse_args()
+
+    from app import create_app, db
+
+    statements = migrate(create_app(), db, dry_run=args.dry_run)
+    for statement in statements:
+        print(f'{statement};')
+    if not statements:
+        print('Schema is up to date')
+
+
+if __name__ == '__main__':
+    main()
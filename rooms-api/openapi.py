@@ -0,0 +1,118 @@
+"""Especificación OpenAPI precalculada y Swagger UI bajo demanda.
+
+``python openapi.py`` genera ``static/openapi.json`` a partir de los ``@swag_from`` de las
+rutas (el Dockerfile lo ejecuta al construir la imagen). En ejecución ``/apispec_1.json``
+sirve ese fichero con ETag y ``Cache-Control``, sin importar flasgger; flasgger solo se
+carga la primera vez que alguien abre ``/docs``.
+"""
+import hashlib
+import json
+import os
+from threading import Lock
+
+from flask import Flask, current_app, request
+
+SPEC_PATH = os.getenv('OPENAPI_SPEC_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'openapi.json'))
+SPEC_MAX_AGE = int(os.getenv('OPENAPI_MAX_AGE', 3600))
+
+
+def swag_from(specs):
+    """Equivalente a ``flasgger.swag_from`` para especificaciones en dict, sin importar flasgger.
+
+    Solo anota la vista (``specs_dict`` es lo que lee flasgger al generar la especificación)
+    y la devuelve sin envolver, así que no añade una llamada por petición.
+    """
+    def decorator(function):
+        function.specs_dict = specs
+        return function
+    return decorator
+
+
+def build_spec(blueprint, config, template):
+    """Genera la especificación con flasgger sobre una app mínima que solo registra ``blueprint``."""
+    from flasgger import Swagger
+
+    app = Flask(__name__)
+    app.register_blueprint(blueprint)
+    swagger = Swagger(app, config=config, template=template)
+    with app.test_request_context():
+        return swagger.get_apispecs(config['specs'][0]['endpoint'])
+
+
+def write_spec(spec, path=SPEC_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as output:
+        json.dump(spec, output, sort_keys=True, separators=(',', ':'))
+
+
+class LazySwaggerUI:
+    """Middleware WSGI que delega ``/docs`` y sus estáticos en una app con flasgger creada al primer acceso.
+
+    No se puede registrar flasgger en la app principal después de la primera petición, así
+    que la interfaz vive en una app Flask aparte que apunta a la especificación estática.
+    """
+
+    def __init__(self, wsgi_app, config, template):
+        self.wsgi_app = wsgi_app
+        self.config = config
+        self.template = template
+        self.prefixes = (config['specs_route'].rstrip('/'), config['static_url_path'])
+        self._docs_app = None
+        self._lock = Lock()
+
+    def docs_app(self):
+        if self._docs_app is None:
+            with self._lock:
+                if self._docs_app is None:
+                    from flasgger import Swagger
+
+                    app = Flask(__name__)
+                    Swagger(app, config=self.config, template=self.template)
+                    self._docs_app = app
+        return self._docs_app
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(self.prefixes):
+            return self.docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+def init_app(app, blueprint, config, template):
+    """Sirve la especificación estática y monta Swagger UI bajo demanda.
+
+    Si no existe el fichero (desarrollo sin ``python openapi.py``), la especificación se
+    genera en la primera petición a ``/apispec_1.json`` y se mantiene en memoria.
+    """
+    state = {'body': None, 'etag': None}
+    lock = Lock()
+
+    def load():
+        if os.path.exists(SPEC_PATH):
+            with open(SPEC_PATH, 'rb') as spec_file:
+                body = spec_file.read()
+        else:
+            body = json.dumps(build_spec(blueprint, config, template), sort_keys=True, separators=(',', ':')).encode()
+        state['etag'] = hashlib.sha1(body).hexdigest()
+        state['body'] = body
+
+    def get_spec():
+        if state['body'] is None:
+            with lock:
+                if state['body'] is None:
+                    load()
+        response = current_app.response_class(state['body'], mimetype='application/json')
+        response.set_etag(state['etag'])
+        response.cache_control.public = True
+        response.cache_control.max_age = SPEC_MAX_AGE
+        return response.make_conditional(request)
+
+    spec = config['specs'][0]
+    app.add_url_rule(spec['route'], spec['endpoint'], get_spec, methods=['GET'])
+    app.wsgi_app = LazySwaggerUI(app.wsgi_app, config, template)
+
+
+if __name__ == '__main__':
+    from app import bp, swagger_config, swagger_template
+
+    write_spec(build_spec(bp, swagger_config, swagger_template))
+    print(f'OpenAPI spec written to {SPEC_PATH}')
@@ -0,0 +1,128 @@
+"""Pool de conexiones configurable por entorno e instrumentado.
+
+``InstrumentedQueuePool`` mide cuánto espera cada petición para obtener una conexión
+(incluido el pre-ping) y cuenta los timeouts, para poder dimensionar workers frente a
+``max_connections`` de MySQL.
+
+Cada worker de gunicorn tiene su propio pool, así que el total es
+``workers × (pool_size + max_overflow)``. Si no se fijan ``DB_POOL_SIZE`` y
+``DB_MAX_OVERFLOW``, se reparten ``DB_MAX_CONNECTIONS`` conexiones entre los
+``GUNICORN_WORKERS`` workers (ver ``default_pool_limits``).
+"""
+from bisect import bisect_left
+from threading import Lock
+import os
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Conexiones de toda la instancia: por debajo de max_connections de MySQL (151 por defecto),
+# con margen para conexiones de administración, migraciones y otros servicios
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', 100))
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 20
+
+# Límites superiores (segundos) de los buckets del histograma de espera
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolStats:
+    def __init__(self, buckets=WAIT_BUCKETS):
+        self.buckets = buckets
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_counts = [0] * (len(self.buckets) + 1)  # el último es +Inf
+
+    def observe_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_sum += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_counts[bisect_left(self.buckets, seconds)] += 1
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative, histogram = 0, {}
+            for bound, count in zip(self.buckets + ('+Inf',), self.wait_counts):
+                cumulative += count
+                histogram[str(bound)] = cumulative
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_sum': round(self.wait_sum, 6),
+                'wait_seconds_max': round(self.wait_max, 6),
+                'wait_seconds_histogram': histogram
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_stats.observe_timeout()
+            raise
+        pool_stats.observe_wait(time.perf_counter() - started)
+        return connection
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def default_pool_limits(workers, max_connections=DB_MAX_CONNECTIONS):
+    """``(pool_size, max_overflow)`` por worker para que ``workers × (pool_size + max_overflow) <= max_connections``.
+
+    Con un solo proceso quedan los valores de siempre (10 + 20); con 17 workers (8 CPU)
+    y 100 conexiones, 5 + 0 por worker.
+    """
+    per_worker = max(max_connections // max(workers, 1), 1)
+    pool_size = min(DEFAULT_POOL_SIZE, per_worker)
+    return pool_size, min(DEFAULT_MAX_OVERFLOW, per_worker - pool_size)
+
+
+def engine_options_from_env():
+    """Opciones de ``create_engine`` para ``SQLALCHEMY_ENGINE_OPTIONS``."""
+    # gunicorn.conf.py exporta GUNICORN_WORKERS con el número de workers que arranca
+    pool_size, max_overflow = default_pool_limits(int(os.getenv('GUNICORN_WORKERS', 1)))
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        # Menor que wait_timeout de MySQL para no reutilizar conexiones cerradas por el servidor
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True)
+    }
+
+
+def pool_status(engine):
+    """Estado instantáneo del pool más los contadores acumulados."""
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout()
+        })
+    status.update(pool_stats.snapshot())
+    return status
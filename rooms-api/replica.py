@@ -0,0 +1,218 @@
+"""Enrutado opcional de lecturas a una réplica de MySQL.
+
+Se activa con ``MYSQL_REPLICA_HOST``: la réplica se registra como bind ``replica`` de
+Flask-SQLAlchemy y las vistas decoradas con ``read_from_replica`` leen de ella. Una vista
+vuelve al primario cuando:
+
+- el cliente escribió hace menos de ``REPLICA_MAX_LAG_SECONDS`` (cookie ``rooms_last_write``
+  o cabecera ``X-Last-Write``, que se devuelven en cada escritura): lee sus propias escrituras;
+- este proceso escribió en esa ventana, para no volver a llenar la caché con datos viejos;
+- la última comprobación de la réplica falló o su retraso supera el umbral.
+"""
+from functools import wraps
+from threading import RLock
+import logging
+import os
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+from sqlalchemy.sql.dml import UpdateBase
+
+import admission
+
+logger = logging.getLogger('rooms-api.replica')
+
+BIND_KEY = 'replica'
+WRITE_COOKIE = 'rooms_last_write'
+WRITE_HEADER = 'X-Last-Write'
+MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+CHECK_INTERVAL_SECONDS = float(os.getenv('REPLICA_CHECK_INTERVAL_SECONDS', 5))
+
+
+def uri_from_env():
+    """URL de la réplica o None; usuario, contraseña, puerto y base de datos son los del primario salvo que se indiquen."""
+    host = os.getenv('MYSQL_REPLICA_HOST')
+    if not host:
+        return None
+    user = os.getenv('MYSQL_REPLICA_USER', os.getenv('MYSQL_USER'))
+    password = os.getenv('MYSQL_REPLICA_PASSWORD', os.getenv('MYSQL_PASSWORD'))
+    port = os.getenv('MYSQL_REPLICA_PORT', os.getenv('MYSQL_PORT'))
+    return f"mysql+pymysql://{user}:{password}@{host}:{port}/{os.getenv('MYSQL_DATABASE')}"
+
+
+class RoutingSession(Session):
+    """Sesión que envía las lecturas de las vistas marcadas al engine de la réplica.
+
+    Es también el punto en que una petición pide plaza al control de admisión, justo antes
+    de su primera consulta (ver admission.py).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        admission.admit()
+        if (
+            bind is None
+            and has_request_context()
+            and g.get('db_route') == BIND_KEY
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            engine = self._db.engines.get(BIND_KEY)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaMonitor:
+    def __init__(self, max_lag=MAX_LAG_SECONDS, check_interval=CHECK_INTERVAL_SECONDS):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.healthy = True
+        self.lag = None
+        self.checked_at = 0.0
+        self.last_local_write = 0.0
+        self.failures = 0
+        self.routed = {}
+        # Reentrante: check() marca la réplica como caída mientras maybe_check() tiene el lock
+        self._lock = RLock()
+
+    def count(self, route):
+        with self._lock:
+            self.routed[route] = self.routed.get(route, 0) + 1
+
+    def mark_unhealthy(self, reason):
+        with self._lock:
+            self.failures += 1
+            if self.healthy:
+                logger.warning('Read replica marked unhealthy: %s', reason)
+            self.healthy = False
+            self.checked_at = time.monotonic()
+
+    def check(self, engine):
+        """Mide el retraso con SHOW REPLICA STATUS; sin permisos o sin datos basta con que responda."""
+        try:
+            with engine.connect().execution_options(replica_probe=True) as connection:
+                try:
+                    status = connection.execute(text('SHOW REPLICA STATUS')).mappings().first()
+                except exc.DBAPIError:
+                    connection.rollback()
+                    status = None
+                    connection.execute(text('SELECT 1'))
+            if status is None:
+                self.lag = None
+            else:
+                lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+                if lag is None:
+                    self.mark_unhealthy('replication is not running')
+                    return
+                self.lag = float(lag)
+            if self.lag is not None and self.lag > self.max_lag:
+                self.mark_unhealthy(f'lag {self.lag:.0f}s exceeds {self.max_lag:.0f}s')
+                return
+            if not self.healthy:
+                logger.info('Read replica is healthy again')
+            self.healthy = True
+            self.checked_at = time.monotonic()
+        except Exception as e:
+            self.mark_unhealthy(e)
+
+    def maybe_check(self, engine):
+        # Solo un hilo comprueba; el resto usa el último estado conocido
+        if time.monotonic() - self.checked_at < self.check_interval or not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self.checked_at >= self.check_interval:
+                self.check(engine)
+        finally:
+            self._lock.release()
+
+    def route(self, engine):
+        """Devuelve ``replica`` o el motivo para leer del primario en esta petición."""
+        last_write = request.cookies.get(WRITE_COOKIE) or request.headers.get(WRITE_HEADER)
+        try:
+            if last_write and time.time() - float(last_write) < self.max_lag:
+                return 'read_your_writes'
+        except ValueError:
+            pass
+        if time.monotonic() - self.last_local_write < self.max_lag:
+            return 'recent_write'
+        self.maybe_check(engine)
+        if not self.healthy:
+            return 'unhealthy'
+        return BIND_KEY
+
+    def stats(self):
+        with self._lock:
+            routed = dict(self.routed)
+        return {
+            'healthy': self.healthy,
+            'lag_seconds': self.lag,
+            'max_lag_seconds': self.max_lag,
+            'failures': self.failures,
+            'routed': routed
+        }
+
+
+monitor = ReplicaMonitor()
+
+
+def read_from_replica(view):
+    """Marca una vista de solo lectura para que sus consultas vayan a la réplica si es seguro."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        engine = g.get('replica_engine')
+        if engine is not None:
+            route = monitor.route(engine)
+            monitor.count(route)
+            if route == BIND_KEY:
+                g.db_route = BIND_KEY
+                g.replica_failed = False
+                try:
+                    response = view(*args, **kwargs)
+                except exc.DBAPIError:
+                    if not g.replica_failed:
+                        raise
+                    response = None
+                # Las vistas suelen capturar la excepción y devolver 500: el fallo lo anota _replica_error
+                if not g.pop('replica_failed'):
+                    return response
+                # La réplica falló durante esta petición: se repite contra el primario
+                g.db_route = None
+                current_app.extensions['sqlalchemy'].session.rollback()
+                monitor.count('retried')
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_app(app, db):
+    """Registra los hooks si hay réplica configurada (bind ``replica``)."""
+    if BIND_KEY not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+
+    @app.before_request
+    def _expose_engine():
+        g.replica_engine = db.engines[BIND_KEY]
+
+    @app.after_request
+    def _remember_write(response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            now = time.time()
+            monitor.last_local_write = time.monotonic()
+            response.set_cookie(WRITE_COOKIE, f'{now:.3f}', max_age=int(monitor.max_lag) + 1, httponly=True)
+            response.headers[WRITE_HEADER] = f'{now:.3f}'
+        return response
+
+    with app.app_context():
+        engine = db.engines[BIND_KEY]
+
+    # Un fallo de conexión en la réplica la saca de rotación hasta la siguiente comprobación y
+    # hace que la petición en curso se repita contra el primario
+    @event.listens_for(engine, 'handle_error')
+    def _replica_error(context):
+        if context.connection is not None and context.connection.get_execution_options().get('replica_probe'):
+            return
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            if has_request_context() and 'replica_failed' in g:
+                g.replica_failed = True
+            monitor.mark_unhealthy(context.original_exception)
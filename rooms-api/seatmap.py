@@ -0,0 +1,56 @@
+"""Bitsets empaquetados de ocupación de asientos por horario.
+
+La posición de un asiento es la columna ``seats.position``, fija desde que se crea el
+asiento. El bit ``i`` (LSB primero dentro de cada byte) vale 1 si la posición ``i`` está
+retenida u ocupada para ese horario.
+"""
+
+
+class SeatConflict(Exception):
+    """Alguna de las posiciones pedidas ya estaba retenida (o ya estaba libre al liberar)."""
+
+    def __init__(self, positions):
+        super().__init__(f'Seats not available: {positions}')
+        self.positions = positions
+
+
+def empty(size):
+    return bytes((size + 7) // 8)
+
+
+def resize(bitmap, size):
+    """Amplía el bitmap hasta ``size`` posiciones (la sala puede haber ganado asientos).
+
+    Nunca lo recorta: un layout leído antes de añadir asientos no borra los bits de los nuevos.
+    """
+    return bytes(bitmap).ljust((size + 7) // 8, b'\x00')
+
+
+def is_set(bitmap, position):
+    return bool(bitmap[position >> 3] & (1 << (position & 7)))
+
+
+def set_bits(bitmap, positions):
+    """Devuelve un bitmap nuevo con ``positions`` a 1; falla si alguna ya lo estaba."""
+    conflicts = [position for position in positions if is_set(bitmap, position)]
+    if conflicts:
+        raise SeatConflict(conflicts)
+    updated = bytearray(bitmap)
+    for position in positions:
+        updated[position >> 3] |= 1 << (position & 7)
+    return bytes(updated)
+
+
+def clear_bits(bitmap, positions):
+    """Devuelve un bitmap nuevo con ``positions`` a 0; falla si alguna no estaba retenida."""
+    conflicts = [position for position in positions if not is_set(bitmap, position)]
+    if conflicts:
+        raise SeatConflict(conflicts)
+    updated = bytearray(bitmap)
+    for position in positions:
+        updated[position >> 3] &= ~(1 << (position & 7)) & 0xFF
+    return bytes(updated)
+
+
+def count_set(bitmap):
+    return sum(bin(byte).count('1') for byte in bitmap)
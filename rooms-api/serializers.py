@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la librería estándar
+    orjson = None
+
+# Campos públicos de cada modelo, en el orden en que se serializan
+ROOM_FIELDS = ('id', 'name', 'capacity', 'screen_type', 'is_active', 'created_at')
+SEAT_FIELDS = ('id', 'room_id', 'row_number', 'seat_number', 'seat_type', 'is_available')
+SCHEDULE_FIELDS = ('id', 'movie_id', 'room_id', 'show_time', 'price', 'is_active')
+# Listados de horarios unidos a la sala (ver schedule_rows_query en app.py)
+SCHEDULE_LIST_FIELDS = SCHEDULE_FIELDS + ('room_name',)
+MOVIE_SCHEDULE_FIELDS = ('id', 'movie_id', 'room_id', 'show_time', 'price', 'room_name', 'room_capacity')
+
+
+def _default(obj):
+    """Tipos que ni orjson ni json saben codificar por sí mismos."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Codifica ``obj`` a bytes JSON (fechas en ISO 8601, Decimal como número)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """Proveedor JSON de Flask respaldado por orjson (usado por ``jsonify``)."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype='application/json')
+
+
+# Serializadores por modelo. Aceptan objetos ORM o filas de consultas por columnas;
+# datetime y Decimal se dejan tal cual y los resuelve el codificador.
+def serialize_room(room, fields=ROOM_FIELDS):
+    return {field: getattr(room, field) for field in fields}
+
+
+def serialize_seat(seat, fields=SEAT_FIELDS):
+    return {field: getattr(seat, field) for field in fields}
+
+
+def serialize_schedule(schedule, fields=SCHEDULE_FIELDS):
+    return {field: getattr(schedule, field) for field in fields}
@@ -0,0 +1,105 @@
+"""Instrumentación SQL por petición (opcional, ``SQL_TRACE_ENABLED=true``).
+
+- Registra en el log las sentencias que superan ``SQL_SLOW_QUERY_MS`` con sus parámetros.
+- Avisa cuando una petición repite la misma forma de sentencia más de
+  ``SQL_REPEAT_THRESHOLD`` veces (típico N+1 de cargas perezosas como ``schedule.room``).
+- Añade ``Server-Timing: db;dur=...`` para ver el tiempo de BD desde el gateway.
+"""
+from collections import Counter
+import logging
+import os
+import re
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('rooms-api.sql')
+
+_IN_LIST = re.compile(r'\((?:\s*(?:%s|\?|:\w+)\s*,)+\s*(?:%s|\?|:\w+)\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normaliza la sentencia para agrupar ejecuciones que solo difieren en valores."""
+    shape = _IN_LIST.sub('(?)', statement)
+    shape = _NUMBER.sub('?', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class SQLTrace:
+    def __init__(self, slow_query_ms=200, repeat_threshold=10, log_parameters=True):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.repeat_threshold = repeat_threshold
+        self.log_parameters = log_parameters
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            slow_query_ms=float(os.getenv('SQL_SLOW_QUERY_MS', 200)),
+            repeat_threshold=int(os.getenv('SQL_REPEAT_THRESHOLD', 10)),
+            log_parameters=os.getenv('SQL_LOG_PARAMETERS', 'true').lower() == 'true'
+        )
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['sqltrace_start'] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop('sqltrace_start', time.perf_counter())
+        if elapsed >= self.slow_query_seconds:
+            logger.warning(
+                'Slow query (%.1f ms)%s: %s%s',
+                elapsed * 1000,
+                f' in {request.method} {request.path}' if has_request_context() else '',
+                _WHITESPACE.sub(' ', statement),
+                f' -- parameters: {parameters!r:.500}' if self.log_parameters else ''
+            )
+        if has_request_context() and 'sqltrace_shapes' in g:
+            g.sqltrace_time += elapsed
+            g.sqltrace_shapes[statement_shape(statement)] += 1
+
+    def _before_request(self):
+        g.sqltrace_time = 0.0
+        g.sqltrace_shapes = Counter()
+
+    def _after_request(self, response):
+        if 'sqltrace_shapes' not in g:
+            return response
+        shapes = g.sqltrace_shapes
+        for shape, count in shapes.items():
+            if count > self.repeat_threshold:
+                logger.warning(
+                    'Possible N+1 in %s %s: statement executed %d times: %s',
+                    request.method, request.path, count, shape
+                )
+        response.headers.add(
+            'Server-Timing', f'db;dur={g.sqltrace_time * 1000:.2f};desc="{sum(shapes.values())} queries"'
+        )
+        return response
+
+
+_trace = None
+
+
+def init_app(app):
+    """Activa la instrumentación si ``SQL_TRACE_ENABLED`` es true; devuelve el SQLTrace o None.
+
+    Los eventos se registran sobre la clase ``Engine``, así que todas las apps creadas en el
+    proceso comparten una sola instancia para no duplicar listeners.
+    """
+    global _trace
+    if os.getenv('SQL_TRACE_ENABLED', 'false').lower() != 'true':
+        return None
+    if _trace is None:
+        _trace = SQLTrace.from_env()
+    _trace.init_app(app)
+    return _trace
@@ -0,0 +1,31 @@
+"""Fixtures comunes: la app sobre una base SQLite en memoria, sin MySQL."""
+import os
+import sys
+
+import pytest
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import app as rooms_app  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = rooms_app.create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        # Una sola conexión compartida: la base en memoria vive mientras exista la conexión
+        'SQLALCHEMY_ENGINE_OPTIONS': {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    })
+    rooms_app.catalog_cache.clear()
+    with app.app_context():
+        rooms_app.db.create_all(bind_key=None)
+        yield app
+        rooms_app.db.session.remove()
+        rooms_app.db.drop_all(bind_key=None)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,53 @@
+"""Refresco incremental del índice de disponibilidad con cambios hechos por otros procesos."""
+from datetime import datetime, timedelta
+
+import app as rooms_app
+from app import Room, Schedule, availability_index, availability_sync, db, sync_availability
+
+
+def write_elsewhere(**values):
+    """Inserta como lo haría otro worker: sin pasar por index_schedule."""
+    db.session.execute(db.insert(Schedule), [values])
+    db.session.commit()
+
+
+def test_refresh_picks_up_rows_committed_behind_the_watermark(app, monkeypatch):
+    monkeypatch.setattr(rooms_app, 'AVAILABILITY_REFRESH_SECONDS', 0)
+    availability_index.clear()
+    availability_sync.update(at=0.0, rooms=None, schedules=None, since=None)
+    show = datetime.now().replace(microsecond=0) + timedelta(days=2)
+    db.session.add(Room(name='Sala', capacity=80))
+    db.session.commit()
+    write_elsewhere(movie_id='m1', room_id=1, show_time=show, price=9, updated_at=datetime.utcnow())
+    sync_availability()
+    assert availability_sync['schedules'] is not None
+
+    # Otra transacción escribió su updated_at antes de la marca pero confirmó después del refresco
+    write_elsewhere(movie_id='m2', room_id=1, show_time=show + timedelta(hours=4), price=9,
+                    updated_at=availability_sync['schedules'] - timedelta(seconds=5))
+    sync_availability()
+
+    rooms = availability_index.search(show + timedelta(hours=4), show + timedelta(hours=5))
+    assert rooms == []
+    assert len(availability_index.timelines[1]) == 2
+
+
+def test_window_before_the_indexed_range_is_rejected(app, client):
+    availability_index.clear()
+    availability_sync.update(at=0.0, rooms=None, schedules=None, since=None)
+    db.session.add(Room(name='Sala', capacity=80))
+    db.session.commit()
+    horizon = datetime.now() - timedelta(days=rooms_app.AVAILABILITY_HORIZON_DAYS)
+    # Empezó antes del horizonte pero sigue en la sala después de él
+    write_elsewhere(movie_id='m1', room_id=1, show_time=horizon - timedelta(hours=1), price=9, duration_minutes=120)
+
+    inside = client.get('/api/rooms/availability', query_string={
+        'from': (horizon + timedelta(minutes=10)).isoformat(), 'to': (horizon + timedelta(minutes=20)).isoformat()
+    })
+    before = client.get('/api/rooms/availability', query_string={
+        'from': (horizon - timedelta(hours=2)).isoformat(), 'to': horizon.isoformat()
+    })
+
+    assert inside.status_code == 200
+    assert inside.get_json()['data'] == []
+    assert before.status_code == 400
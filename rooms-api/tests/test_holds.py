@@ -0,0 +1,98 @@
+"""Ciclo de vida de las retenciones de asientos: nunca dos retenciones sobre el mismo asiento."""
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+import seatmap
+from app import Room, Schedule, Seat, SeatHold, db
+
+
+@pytest.fixture
+def schedule(app):
+    room = Room(name='Sala 1', capacity=10)
+    db.session.add(room)
+    db.session.flush()
+    db.session.add_all(
+        Seat(room_id=room.id, row_number='A', seat_number=number + 1, position=number) for number in range(10)
+    )
+    schedule = Schedule(movie_id='m1', room_id=room.id, show_time=datetime.now() + timedelta(days=1), price=9.5)
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule.id
+
+
+def hold(client, schedule_id, positions, **extra):
+    return client.post(f'/api/schedules/{schedule_id}/holds', json=dict(positions=positions, **extra))
+
+
+def expire(hold_id):
+    """Adelanta el vencimiento en lugar de esperar al TTL."""
+    db.session.execute(db.update(SeatHold).where(SeatHold.id == hold_id)
+                       .values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+
+
+def held_positions(client, schedule_id):
+    data = client.get(f'/api/schedules/{schedule_id}/seatmap').get_json()['data']
+    bitmap = base64.b64decode(data['bitmap'])
+    return [position for position in range(data['size']) if seatmap.is_set(bitmap, position)]
+
+
+def test_overlapping_hold_is_rejected(client, schedule):
+    assert hold(client, schedule, [1, 2]).status_code == 201
+
+    response = hold(client, schedule, [2, 3])
+
+    assert response.status_code == 409
+    assert held_positions(client, schedule) == [1, 2]
+
+
+def test_release_frees_the_seats_once(client, schedule):
+    hold_id = hold(client, schedule, [4]).get_json()['data']['hold_id']
+
+    assert client.post(f'/api/schedules/{schedule}/holds/{hold_id}/release').status_code == 200
+    assert client.post(f'/api/schedules/{schedule}/holds/{hold_id}/release').status_code == 409
+    assert held_positions(client, schedule) == []
+    assert hold(client, schedule, [4]).status_code == 201
+
+
+def test_confirm_after_expiry_is_rejected(client, schedule):
+    hold_id = hold(client, schedule, [5]).get_json()['data']['hold_id']
+    expire(hold_id)
+
+    response = client.post(f'/api/schedules/{schedule}/holds/{hold_id}/confirm')
+
+    assert response.status_code == 409
+    assert response.get_json()['data']['status'] == 'expired'
+    assert held_positions(client, schedule) == []
+
+
+def test_sweep_clears_only_expired_holds(client, schedule):
+    expired_id = hold(client, schedule, [0, 1]).get_json()['data']['hold_id']
+    active_id = hold(client, schedule, [6, 7]).get_json()['data']['hold_id']
+    confirmed_id = hold(client, schedule, [8]).get_json()['data']['hold_id']
+    assert client.post(f'/api/schedules/{schedule}/holds/{confirmed_id}/confirm').status_code == 200
+    expire(expired_id)
+
+    response = client.post('/api/holds/sweep')
+
+    assert response.get_json()['data'] == {'expired': 1}
+    assert held_positions(client, schedule) == [6, 7, 8]
+    assert db.session.get(SeatHold, active_id).status == 'held'
+
+
+@pytest.mark.parametrize('body', [
+    {'seat_ids': 5},
+    {'seat_ids': [[1]]},
+    {'seat_ids': [True]},
+    {'positions': [True]},
+    {'positions': 'abc'},
+    {'positions': [1], 'ttl_seconds': True},
+    [1, 2],
+])
+def test_invalid_hold_requests_are_400(client, schedule, body):
+    response = client.post(f'/api/schedules/{schedule}/holds', json=body)
+
+    assert response.status_code == 400
+    assert held_positions(client, schedule) == []
@@ -0,0 +1,32 @@
+"""Reparto de conexiones entre workers."""
+import pytest
+
+from admission import default_limits
+from pool import default_pool_limits, engine_options_from_env
+
+
+@pytest.mark.parametrize('workers', [1, 3, 9, 17, 33, 150, 400])
+def test_default_limits_fit_the_connection_budget(workers):
+    pool_size, max_overflow = default_pool_limits(workers, max_connections=100)
+
+    assert pool_size >= 1 and max_overflow >= 0
+    assert workers * (pool_size + max_overflow) <= max(100, workers)
+
+
+def test_single_process_keeps_the_usual_pool():
+    assert default_pool_limits(1, max_connections=100) == (10, 20)
+
+
+def test_explicit_sizes_win(monkeypatch):
+    monkeypatch.setenv('GUNICORN_WORKERS', '17')
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+    options = engine_options_from_env()
+
+    assert (options['pool_size'], options['max_overflow']) == (7, 0)
+
+
+@pytest.mark.parametrize('workers, limits', [('1', (29, 14)), ('9', (10, 5)), ('17', (4, 2)), ('150', (1, 2))])
+def test_admission_defaults_follow_the_worker_pool(monkeypatch, workers, limits):
+    monkeypatch.setenv('GUNICORN_WORKERS', workers)
+
+    assert default_limits() == limits
@@ -0,0 +1,57 @@
+"""Vuelta al primario cuando la réplica falla durante una petición."""
+import time
+
+import pytest
+from flask import g
+from sqlalchemy.pool import StaticPool
+
+import app as rooms_app
+import replica
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    # Réplica inalcanzable: el fichero está en un directorio que no existe
+    app = rooms_app.create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'SQLALCHEMY_BINDS': {replica.BIND_KEY: f'sqlite:///{tmp_path}/missing/replica.db'},
+        'SQLALCHEMY_ENGINE_OPTIONS': {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+    })
+    rooms_app.catalog_cache.clear()
+    # La última comprobación dio la réplica por sana, así que la petición se enruta a ella
+    monkeypatch.setattr(replica, 'monitor', replica.ReplicaMonitor())
+    replica.monitor.checked_at = time.monotonic()
+    with app.app_context():
+        rooms_app.db.create_all(bind_key=None)
+        rooms_app.db.session.add(rooms_app.Room(name='Sala 1', capacity=10))
+        rooms_app.db.session.commit()
+        yield app
+        rooms_app.db.session.remove()
+        rooms_app.db.drop_all(bind_key=None)
+
+
+def test_read_is_retried_on_primary_when_replica_fails(replica_app):
+    response = replica_app.test_client().get('/api/rooms')
+
+    assert response.status_code == 200
+    assert [room['name'] for room in response.get_json()['data']] == ['Sala 1']
+    assert replica.monitor.routed == {replica.BIND_KEY: 1, 'retried': 1}
+    assert not replica.monitor.healthy
+
+
+def test_failure_in_another_request_does_not_trigger_a_retry(replica_app):
+    calls = []
+
+    def view():
+        calls.append(g.db_route)
+        # Otro hilo ve caer la réplica mientras esta petición ya había leído de ella
+        replica.monitor.mark_unhealthy('failed in another request')
+        return 'ok'
+
+    with replica_app.test_request_context('/api/rooms'):
+        g.replica_engine = rooms_app.db.engines[replica.BIND_KEY]
+        assert replica.read_from_replica(view)() == 'ok'
+
+    assert calls == [replica.BIND_KEY]
+    assert 'retried' not in replica.monitor.routed
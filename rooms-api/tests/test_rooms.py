@@ -0,0 +1,32 @@
+"""Respuestas de las rutas de salas para ids inexistentes."""
+import pytest
+
+import app as rooms_app
+
+
+@pytest.mark.parametrize('path', [
+    '/api/rooms/999',
+    '/api/rooms/999?fields=name',
+    '/api/rooms/999/seats',
+])
+def test_missing_room_is_404(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 404
+    assert response.get_json() == {'success': False, 'error': 'Room not found'}
+
+
+def test_create_seats_for_missing_room_is_404(client):
+    response = client.post('/api/rooms/999/seats', json={'auto_generate': True})
+
+    assert response.status_code == 404
+
+
+def test_existing_room_partial_fields(app, client):
+    rooms_app.db.session.add(rooms_app.Room(name='Sala 1', capacity=10))
+    rooms_app.db.session.commit()
+
+    response = client.get('/api/rooms/1?fields=name')
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'name': 'Sala 1'}
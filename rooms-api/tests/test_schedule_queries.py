@@ -0,0 +1,49 @@
+"""Los listados de horarios hacen un número fijo de consultas, sea cual sea el tamaño de página."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import Room, Schedule, db
+
+
+@pytest.fixture
+def schedules(app):
+    rooms = [Room(name=f'Sala {i}', capacity=50 + i) for i in range(4)]
+    db.session.add_all(rooms)
+    db.session.flush()
+    start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    db.session.add_all(
+        Schedule(movie_id='m1', room_id=rooms[i % len(rooms)].id, show_time=start + timedelta(hours=i), price=9.5)
+        for i in range(80)
+    )
+    db.session.commit()
+
+
+def statements_for(client, url):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.get_json()
+    return executed, response.get_json()['data']
+
+
+@pytest.mark.parametrize('path, room_field', [
+    ('/api/schedules', 'room_name'),
+    ('/api/schedules/movie/m1', 'room_capacity'),
+])
+def test_query_count_does_not_depend_on_page_size(client, schedules, path, room_field):
+    small, small_page = statements_for(client, f'{path}?limit=5')
+    large, large_page = statements_for(client, f'{path}?limit=60')
+
+    assert (len(small_page), len(large_page)) == (5, 60)
+    assert all(row[room_field] for row in large_page)
+    # Marcador de versión (ETag) y una única consulta con la sala unida: sin consultas por fila
+    assert len(small) == len(large) == 2
@@ -0,0 +1,39 @@
+"""Alta masiva de horarios con fechas con zona horaria."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import Room, Schedule, db
+
+
+@pytest.fixture
+def room(app):
+    room = Room(name='Sala 1', capacity=80)
+    db.session.add(room)
+    db.session.commit()
+    return room.id
+
+
+def bulk(client, *schedules):
+    return client.post('/api/schedules/bulk', json={'schedules': list(schedules)})
+
+
+def test_aware_show_time_is_converted_to_server_local_time(client, room):
+    show = datetime(2030, 5, 1, 10, 0, tzinfo=timezone(timedelta(hours=5)))
+
+    response = bulk(client, {'movie_id': 'm1', 'room_id': room, 'show_time': show.isoformat(), 'price': 9.5})
+
+    assert response.status_code == 201, response.get_json()
+    stored = db.session.query(Schedule.show_time).scalar()
+    assert stored == show.astimezone().replace(tzinfo=None)
+
+
+def test_overlap_is_checked_on_the_converted_time(client, room):
+    show = datetime(2030, 5, 1, 10, 0, tzinfo=timezone(timedelta(hours=5)))
+    local = show.astimezone().replace(tzinfo=None)
+    assert bulk(client, {'movie_id': 'm1', 'room_id': room, 'show_time': local.isoformat(), 'price': 9.5}).status_code == 201
+
+    response = bulk(client, {'movie_id': 'm2', 'room_id': room, 'show_time': show.isoformat(), 'price': 9.5})
+
+    assert response.status_code == 207
+    assert response.get_json()['data']['results'][0]['status'] == 'conflict'
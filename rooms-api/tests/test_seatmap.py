@@ -0,0 +1,23 @@
+"""Layout del mapa de asientos de una sesión."""
+from datetime import datetime, timedelta
+
+from app import Room, Schedule, Seat, db
+
+
+def test_double_letter_rows_follow_single_letter_rows(client, app):
+    room = Room(name='Sala 1', capacity=4)
+    db.session.add(room)
+    db.session.flush()
+    # Posiciones en orden de alta: la fila AA se añadió antes que la B
+    db.session.add_all(
+        Seat(room_id=room.id, row_number=row, seat_number=1, position=position)
+        for position, row in enumerate(['A', 'AA', 'B', 'Z'])
+    )
+    schedule = Schedule(movie_id='m1', room_id=room.id, show_time=datetime.now() + timedelta(days=1), price=9.5)
+    db.session.add(schedule)
+    db.session.commit()
+
+    data = client.get(f'/api/schedules/{schedule.id}/seatmap').get_json()['data']
+
+    assert [row['row'] for row in data['rows']] == ['A', 'B', 'Z', 'AA']
+    assert [row['seats'][0][3] for row in data['rows']] == [0, 2, 3, 1]